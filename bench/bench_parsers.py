@@ -0,0 +1,57 @@
+# bench/bench_parsers.py
+# Vergleicht Streaming-Extraktion vs. BeautifulSoup-Vollparse auf gespeicherten HTML-Fixtures.
+#   python bench/bench_parsers.py [-n 50]
+import os, sys, time, tracemalloc, argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT / "scripts"))
+os.environ.setdefault("DISCORD_WEBHOOK_URL", "http://127.0.0.1/api/webhooks/0/bench")
+import ow_status as ow
+
+CASES = [
+    # (Fixture, Name, Streaming-Variante, Vollparse-Variante)
+    ("news_index.html",       "news (ld+json)", ow.parse_latest_news, ow.parse_latest_news_soup),
+    ("news_index_links.html", "news (links)",   ow.parse_latest_news, ow.parse_latest_news_soup),
+    ("maintenance.html",      "maintenance",    lambda h: ow.parse_maintenance_hint(h), None),
+]
+
+def measure(fn, html, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        res = fn(html)
+    ms = (time.perf_counter() - t0) * 1000.0 / n
+    tracemalloc.start()
+    fn(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return res, ms, peak / 1024.0
+
+def with_parser(mode, fn):
+    def run(html):
+        old, ow.HTML_PARSER = ow.HTML_PARSER, mode
+        try: return fn(html)
+        finally: ow.HTML_PARSER = old
+    return run
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=30, help="Wiederholungen pro Messung")
+    args = ap.parse_args()
+
+    print(f"{'case':<16} {'size':>7} {'mode':<7} {'ms/parse':>9} {'peak KiB':>9}  result")
+    for fixture, name, stream_fn, soup_fn in CASES:
+        html = (FIXTURES / fixture).read_text(encoding="utf-8")
+        soup_fn = soup_fn or with_parser("soup", stream_fn)
+        rs, ms_s, kb_s = measure(with_parser("stream", stream_fn), html, args.n)
+        rf, ms_f, kb_f = measure(soup_fn, html, args.n)
+        size = f"{len(html)//1024}K"
+        print(f"{name:<16} {size:>7} {'soup':<7} {ms_f:>9.2f} {kb_f:>9.0f}  {rf}")
+        print(f"{'':<16} {'':>7} {'stream':<7} {ms_s:>9.2f} {kb_s:>9.0f}  {rs}")
+        if tuple(rs) != tuple(rf):
+            print(f"  !! Ergebnis weicht ab: stream={rs!r} soup={rf!r}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
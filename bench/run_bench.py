@@ -0,0 +1,261 @@
+# bench/run_bench.py
+# Offline-Benchmark des kompletten Laufs (run_once) gegen lokale Stand-ins:
+#   - TCP-Listener je Host aus REGION_HOSTS/PLATFORM_SIGNALS (eigene 127.0.0.x-Adresse, gleicher Port)
+#   - HTTP-Server mit den Fixtures (Forum-JSON, News, Wartung, Statusseiten) inkl. ETag/304
+#   - Fake-Discord-Webhook mit einstellbarer Latenz, Fehlern und 429ern
+# Gemessen werden pro Stage und End-to-End: Wall-Clock, CPU und Peak-Speicher.
+#   python bench/run_bench.py --runs 3 --discord-429 1 --down-hosts kr.actual.battle.net
+#   python bench/run_bench.py --group-hosts 400 --procs 4      # große Ziellisten, auf Prozesse verteilt
+import os, re, sys, json, time, random, socket, hashlib, argparse, tempfile, threading, tracemalloc, resource, datetime
+import http.server
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# =========================
+# Fake-TCP-Hosts
+# =========================
+def start_tcp_hosts(hosts, down=(), blackhole=()):
+    """
+    Jeder Host bekommt eine eigene Loopback-Adresse, alle auf demselben Port.
+    down = kein Listener (Connection refused), blackhole = volle Accept-Queue (Connect-Timeout).
+    """
+    probe = socket.socket(); probe.bind(("127.0.0.1", 0)); port = probe.getsockname()[1]; probe.close()
+    mapping, socks = {}, []
+    for i, host in enumerate(sorted(hosts), start=2):
+        ip = f"127.0.{i // 250}.{i % 250 + 1}"
+        mapping[host] = ip
+        if host in down:
+            continue
+        s = socket.socket(); s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((ip, port))
+        if host in blackhole:
+            s.listen(0)
+            for _ in range(4):   # Accept-Queue füllen, danach werden SYNs verworfen
+                f = socket.socket(); f.setblocking(False); f.connect_ex((ip, port)); socks.append(f)
+        else:
+            s.listen(128)
+            threading.Thread(target=_accept_loop, args=(s,), daemon=True).start()
+        socks.append(s)
+    return port, mapping, socks
+
+def _accept_loop(s):
+    while True:
+        try: c, _ = s.accept(); c.close()
+        except OSError: return
+
+# =========================
+# Fake-Quellen (HTTP)
+# =========================
+_FORUM_DELTA = []
+
+def _shifted_forum(name):
+    # aufgezeichnete Zeitstempel so verschieben, dass der neueste Beitrag ~1h alt ist
+    # (Verschiebung einmal pro Prozess, sonst wirkt jedes Topic bei jedem Lauf "geändert")
+    data = json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+    topics = data.get("topic_list", {}).get("topics", [])
+    parse = lambda s: datetime.datetime.fromisoformat(s.replace("Z", "+00:00"))
+    if not _FORUM_DELTA:
+        ref = parse(json.loads((FIXTURES / "known_issues.json").read_text())["topic_list"]["topics"][0]["last_posted_at"])
+        _FORUM_DELTA.append(datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1) - ref)
+    delta = _FORUM_DELTA[0]
+    for t in topics:
+        for k in ("last_posted_at", "bumped_at"):
+            if t.get(k): t[k] = (parse(t[k]) + delta).isoformat().replace("+00:00", "Z")
+    return json.dumps(data).encode()
+
+class SourceHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    stats = {"requests": 0, "not_modified": 0}
+
+    def _body(self):
+        path, _, query = self.path.partition("?")
+        if path == "/forum/64.json":
+            return _shifted_forum("known_issues_page1.json" if "page=1" in query else "known_issues.json"), "application/json"
+        if path.startswith("/forum/"):
+            return b'{"topic_list":{"topics":[]}}', "application/json"
+        files = {"/maintenance": "maintenance.html", "/news": "news_index.html",
+                 "/status/playstation": "status_playstation.html", "/status/xbox": "status_xbox.html",
+                 "/status/nintendo": "status_nintendo.html"}
+        if path in files:
+            return (FIXTURES / files[path]).read_bytes(), "text/html; charset=utf-8"
+        return b"<html><body>ok</body></html>", "text/html"
+
+    def _send(self, head=False):
+        time.sleep(self.latency)
+        type(self).stats["requests"] += 1
+        body, ctype = self._body()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            type(self).stats["not_modified"] += 1
+            self.send_response(304); self.send_header("ETag", etag); self.send_header("Content-Length", "0"); self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype); self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body))); self.end_headers()
+        if not head: self.wfile.write(body)
+
+    def do_GET(self):  self._send()
+    def do_HEAD(self): self._send(head=True)
+    def log_message(self, *a): pass
+
+# =========================
+# Fake-Discord
+# =========================
+class DiscordHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency, fail_rate, n429 = 0.0, 0.0, 0
+    stats = {"requests": 0, "429": 0, "5xx": 0}
+    _seen = {}
+    _lock = threading.Lock()
+    _rng = random.Random(1)
+
+    def _do(self):
+        n = int(self.headers.get("Content-Length") or 0); self.rfile.read(n)
+        wid = re.search(r"/webhooks/(\w+)/", self.path).group(1)
+        time.sleep(self.latency)
+        with self._lock:
+            type(self).stats["requests"] += 1
+            seen = self._seen[wid] = self._seen.get(wid, 0) + 1
+            fail = self._rng.random() < self.fail_rate
+        if seen <= self.n429:
+            type(self).stats["429"] += 1
+            return self._reply(429, {"retry_after": 0.25}, {"Retry-After": "0.25", "X-RateLimit-Remaining": "0",
+                                                            "X-RateLimit-Reset-After": "0.25", "X-RateLimit-Bucket": f"b{wid}"})
+        if fail:
+            type(self).stats["5xx"] += 1
+            return self._reply(502, {"message": "bad gateway"})
+        self._reply(200, {"id": f"{wid}00{seen}"}, {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "2",
+                                                    "X-RateLimit-Bucket": f"b{wid}"})
+
+    def _reply(self, status, obj, headers=None):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(body)))
+        self.end_headers(); self.wfile.write(body)
+
+    do_POST = do_PATCH = _do
+    def log_message(self, *a): pass
+
+def serve(handler):
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{srv.server_address[1]}"
+
+# =========================
+# Messung
+# =========================
+STAGE_FUNCS = ["execute_probe_plan", "check_platforms", "fetch_maintenance_hint", "fetch_known_issues_summary",
+               "fetch_latest_news", "build_status", "render_sparkline", "publish_all"]
+
+def instrument(ow, records):
+    # Stage-Funktionen im Modul umhüllen: Wall-Clock + CPU des ausführenden Threads
+    lock = threading.Lock()
+    for name in STAGE_FUNCS:
+        fn = getattr(ow, name)
+        def wrapped(*a, _fn=fn, _name=name, **kw):
+            t0, c0 = time.perf_counter(), time.thread_time()
+            try: return _fn(*a, **kw)
+            finally:
+                with lock:
+                    records.append((_name, (time.perf_counter()-t0)*1000.0, (time.thread_time()-c0)*1000.0))
+        setattr(ow, name, wrapped)
+
+def point_sources_at(ow, base):
+    ow.MAINT_URL = f"{base}/maintenance"
+    ow.KNOWN_ISSUES_JSON = f"{base}/forum/64.json"
+    ow.NEWS_INDEX_URL = f"{base}/news"
+    pages = {"PlayStation": "playstation", "Xbox": "xbox", "Switch": "nintendo"}
+    for name, cfg in ow.PLATFORM_SIGNALS.items():
+        cfg["urls"] = [f"{base}/head/{name.lower()}/{i}" for i in range(len(cfg["urls"]))]
+        cfg["status_url"] = f"{base}/status/{pages.get(name, name.lower())}"
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline-Benchmark für scripts/ow_status.py")
+    ap.add_argument("--runs", type=int, default=3, help="Läufe (der erste startet mit leerem State)")
+    ap.add_argument("--fast", action="store_true", help="run_once(fast=True)")
+    ap.add_argument("--samples", type=int, default=2)
+    ap.add_argument("--http-latency", type=float, default=0.02, help="s pro Quellen-Request")
+    ap.add_argument("--discord-latency", type=float, default=0.05)
+    ap.add_argument("--discord-fail", type=float, default=0.0, help="Anteil 5xx-Antworten")
+    ap.add_argument("--discord-429", type=int, default=0, help="so viele 429 pro Webhook vorweg")
+    ap.add_argument("--webhooks", type=int, default=1)
+    ap.add_argument("--down-hosts", default="", help="kommagetrennt: Connection refused")
+    ap.add_argument("--blackhole-hosts", default="", help="kommagetrennt: Connect-Timeout")
+    ap.add_argument("--probe-timeout", type=float, default=1.0)
+    ap.add_argument("--group-hosts", type=int, default=0, help="zusätzliche Zielgruppe mit so vielen Hosts (4 Regionen)")
+    ap.add_argument("--procs", type=int, default=1, help="PROBE_PROCS")
+    ap.add_argument("--probe-mode", default="tcp", choices=("tcp", "tls", "http"), help="PROBE_MODE (Fake-Hosts sprechen kein TLS)")
+    ap.add_argument("--json", help="Ergebnis zusätzlich als JSON schreiben (Vergleich Lauf zu Lauf)")
+    args = ap.parse_args()
+
+    SourceHandler.latency = args.http_latency
+    DiscordHandler.latency, DiscordHandler.fail_rate, DiscordHandler.n429 = args.discord_latency, args.discord_fail, args.discord_429
+    src, hook = serve(SourceHandler), serve(DiscordHandler)
+
+    split = lambda s: {h.strip() for h in s.split(",") if h.strip()}
+    json_out = Path(args.json).resolve() if args.json else None
+    workdir = tempfile.mkdtemp(prefix="ow-bench-")
+    os.chdir(workdir)
+    os.environ.update({
+        "DISCORD_WEBHOOK_URLS": ",".join(f"{hook}/api/webhooks/{1000+i}/tok{i}" for i in range(args.webhooks)),
+        "SAMPLES": str(args.samples), "PROBE_TIMEOUT": str(args.probe_timeout),
+        "PROBE_DEADLINE": str(args.probe_timeout * 2), "PLATFORM_DEADLINE": str(args.probe_timeout * 4),
+        "SOURCE_BUDGET": "20", "GITHUB_REPOSITORY": "", "PROBE_PROCS": str(args.procs), "PROBE_MODE": args.probe_mode,
+        "TARGETS_FILE": str(Path(workdir) / "targets.json"),
+    })
+    targets = json.loads((ROOT / "config" / "targets.json").read_text(encoding="utf-8"))
+    if args.group_hosts:
+        targets["groups"] = {"Synthetic": {"regions": {
+            r: [f"{r.lower()}-{i}.synthetic.test" for i in range(k, args.group_hosts, 4)]
+            for k, r in enumerate(("EU", "NA", "ASIA", "SA"))}}}
+    (Path(workdir) / "targets.json").write_text(json.dumps(targets), encoding="utf-8")
+    # Worker-Prozesse (spawn) importieren das Modul erneut unter demselben Namen
+    sys.path.insert(0, str(ROOT / "scripts"))
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("ow_status", ROOT / "scripts" / "ow_status.py")
+    ow = sys.modules["ow_status"] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ow)
+
+    hosts = {h for hs in ow.make_probe_plan()["regions"].values() for h in hs} | {h for c in ow.PLATFORM_SIGNALS.values() for h in c["hosts"]}
+    port, mapping, _socks = start_tcp_hosts(hosts, down=split(args.down_hosts), blackhole=split(args.blackhole_hosts))
+    ow.PROBE_PORT = port
+    ow.RESOLVER.static.update(mapping)
+    point_sources_at(ow, src)
+
+    records = []
+    instrument(ow, records)
+    results = []
+    for i in range(args.runs):
+        records.clear()
+        tracemalloc.start()
+        t0, c0 = time.perf_counter(), time.process_time()
+        ow.run_once(fast=args.fast)
+        wall, cpu = (time.perf_counter()-t0)*1000.0, (time.process_time()-c0)*1000.0
+        peak = tracemalloc.get_traced_memory()[1] / 1024.0
+        tracemalloc.stop()
+        stages = {}
+        for name, w, c in records:
+            s = stages.setdefault(name, {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+            s["calls"] += 1; s["wall_ms"] += w; s["cpu_ms"] += c
+        results.append({"run": i, "wall_ms": round(wall, 1), "cpu_ms": round(cpu, 1), "peak_kib": round(peak),
+                        "stages": {k: {kk: round(vv, 1) if isinstance(vv, float) else vv for kk, vv in v.items()} for k, v in stages.items()}})
+
+    print(f"workdir: {workdir}")
+    print(f"{'run':<4} {'wall ms':>9} {'cpu ms':>9} {'peak KiB':>9}")
+    for r in results:
+        print(f"{r['run']:<4} {r['wall_ms']:>9.1f} {r['cpu_ms']:>9.1f} {r['peak_kib']:>9}")
+        for name in STAGE_FUNCS:
+            if s := r["stages"].get(name):
+                print(f"       {name:<28} {s['wall_ms']:>9.1f} {s['cpu_ms']:>9.1f}  x{s['calls']}")
+    print(f"sources: {SourceHandler.stats}  discord: {DiscordHandler.stats}  maxrss: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} KiB")
+    if json_out:
+        out = {"args": vars(args), "runs": results, "sources": SourceHandler.stats, "discord": DiscordHandler.stats}
+        json_out.write_text(json.dumps(out, indent=1), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,82 @@
 # scripts/ow_status.py
-import os, time, json, socket, datetime, re, statistics
+import os, io, time, json, socket, datetime, re, statistics, threading, hashlib, struct, math, sqlite3, zlib
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
 from pathlib import Path
-import requests
-from bs4 import BeautifulSoup
+# requests, bs4 und PIL werden erst bei Bedarf importiert (Fast-Path braucht keins davon)
 
 # =========================
 # Grundkonfiguration / State-Verzeichnisse
 # =========================
 STATE_DIR  = Path(".bot_state"); STATE_DIR.mkdir(parents=True, exist_ok=True)
-MID_FILE   = STATE_DIR / "ow_message_id.txt"
+STATE_DB   = STATE_DIR / "state.db"   # SQLite (WAL): alle JSON-Dokumente unten, Schlüssel = Dateiname ohne Endung
+# die *.json-Pfade sind nur noch Schlüssel bzw. Quelle für den einmaligen Import
+MID_FILE   = STATE_DIR / "ow_message_id.txt"    # alt (ein Webhook), nur noch Quelle für die Migration
+MIDS_FILE  = STATE_DIR / "ow_message_ids.json"  # Webhook-ID -> Message-ID
 LAST_FILE  = STATE_DIR / "last_payload.json"
-HIST_FILE  = STATE_DIR / "history.json"
+DIGEST_FILE = STATE_DIR / "last_digest.json"   # Hash des semantischen Inhalts + Zeitpunkt der letzten Veröffentlichung
+HIST_FILE  = STATE_DIR / "history.json"   # alt, nur noch Quelle für die Migration
+HIST_BIN   = STATE_DIR / "history.bin"
 LAT_FILE   = STATE_DIR / "last_latency.json"
+SKETCH_FILE = STATE_DIR / "latency_sketch.json"
 STATE_FILE = STATE_DIR / "state.json"
 CHANGELOG  = STATE_DIR / "changelog.json"
 PLATFORM_CACHE = STATE_DIR / "platform_cache.json"
+SOURCES_FILE = STATE_DIR / "sources.json"   # letzte gute Werte je Quelle
+HTTP_CACHE   = STATE_DIR / "http_cache.json"  # ETag/Last-Modified + geparste Ergebnisse je URL
+KI_INDEX     = STATE_DIR / "known_issues_index.json"  # Topic-ID -> [last_posted_at, Titel, Slug]
+METRICS_FILE = STATE_DIR / "metrics.json"     # Zeitspannen des letzten Laufs
+FEED_FILE    = Path(os.environ.get("FEED_FILE", str(STATE_DIR / "status_feed.json")))   # für die Statusseite
 
 SPARK_PATH = Path("assets/sparkline.png")
 REPO       = os.environ.get("GITHUB_REPOSITORY", "")
 
-WEBHOOK   = os.environ["DISCORD_WEBHOOK_URL"].strip()
+# mehrere Webhooks (Komma/Zeilenumbruch getrennt) über DISCORD_WEBHOOK_URLS, sonst der einzelne
+WEBHOOKS  = [u for u in re.split(r"[\s,]+", os.environ.get("DISCORD_WEBHOOK_URLS") or os.environ.get("DISCORD_WEBHOOK_URL", "")) if u]
+WEBHOOK   = WEBHOOKS[0] if WEBHOOKS else ""
 THUMB_URL = os.environ.get("THUMB_URL", "").strip()
 STATUS_PAGE_URL = os.environ.get("STATUS_PAGE_URL", "https://f1nn303.github.io/Owstatusupdater/").strip()
-REGIONS   = [r.strip() for r in os.environ.get("REGIONS", "EU,NA,ASIA").split(",") if r.strip()]
+REGIONS   = [r.strip() for r in os.environ.get("REGIONS", "").split(",") if r.strip()]   # leer = alle aus der Konfig
 
 UA = {"User-Agent": "OW2-Status/1.4 (+github-actions)"}
 
+# Ziele, Regionen, Schwellen und Keywords aus einer Konfigurationsdatei (fehlt sie: eingebaute Defaults).
+# Umgebungsvariablen (INFO_MS, WARN_MS, REGIONS) haben weiterhin Vorrang; ohne REGIONS gelten alle
+# Regionen aus der Konfig – eine neue Region braucht also nur einen Eintrag in targets.json.
+TARGETS_FILE = Path(os.environ.get("TARGETS_FILE", "config/targets.json"))
+try:
+    TARGETS = json.loads(TARGETS_FILE.read_text(encoding="utf-8"))
+except OSError:
+    TARGETS = {}
+
 # =========================
 # Farbdefinitionen & Schwellen
 # =========================
 COLORS = {"ok": 0x2ECC71, "info": 0x3498DB, "warn": 0xF1C40F, "unknown": 0x95A5A6}
 ORDER  = {"ok":0, "info":1, "warn":2, "unknown":3}
-INFO_MS = float(os.environ.get("INFO_MS", "200"))
-WARN_MS = float(os.environ.get("WARN_MS", "400"))
+INFO_MS = float(os.environ.get("INFO_MS") or TARGETS.get("thresholds", {}).get("info_ms", 200))
+WARN_MS = float(os.environ.get("WARN_MS") or TARGETS.get("thresholds", {}).get("warn_ms", 400))
 SAMPLES = int(os.environ.get("SAMPLES", "2"))
+PROBE_TIMEOUT  = float(os.environ.get("PROBE_TIMEOUT", "3"))
+PROBE_DEADLINE = float(os.environ.get("PROBE_DEADLINE", "8"))   # Gesamtbudget aller Probes (s)
+PROBE_WORKERS  = int(os.environ.get("PROBE_WORKERS", "64"))      # Threads je Prozess
+PROBE_PROCS    = min(int(os.environ.get("PROBE_PROCS", "1")), os.cpu_count() or 1)   # >1: Probes auf Worker-Prozesse verteilen
+PROBE_SHARD_MIN = int(os.environ.get("PROBE_SHARD_MIN", "200"))   # ... aber erst ab so vielen Probes
+PROBE_PER_DEST = int(os.environ.get("PROBE_PER_DEST", "4"))       # max. gleichzeitige Connects je Ziel-IP
+# "tcp" = nur Connect, "tls" = + Handshake, "http" = + HEAD / (TTFB, Status) – alles auf einer Verbindung
+PROBE_MODE = os.environ.get("PROBE_MODE") or TARGETS.get("probe_mode", "tcp")
+# adaptiv: SAMPLES ist nur die Start-Charge, nachgelegt wird, solange das Konfidenzintervall zu breit ist
+ADAPTIVE_SAMPLING = os.environ.get("ADAPTIVE_SAMPLING", "false").lower() in ("1", "true", "yes")
+SAMPLES_MAX_REGION = int(os.environ.get("SAMPLES_MAX_REGION", "24"))   # Obergrenze je Region
+CI_REL    = float(os.environ.get("CI_REL", "0.10"))     # 95%-KI des Mittelwerts: ±10 % ...
+CI_ABS_MS = float(os.environ.get("CI_ABS_MS", "5"))     # ... aber nie enger als ±5 ms verlangt
+LOSS_CI_WIDTH = float(os.environ.get("LOSS_CI_WIDTH", "0.30"))   # max. Breite des Wilson-KI für Loss
+DNS_TTL     = float(os.environ.get("DNS_TTL", "300"))   # getaddrinfo kennt keine TTL -> feste Gültigkeit
+DNS_NEG_TTL = float(os.environ.get("DNS_NEG_TTL", "30"))
+PROBE_PORT  = int(os.environ.get("PROBE_PORT", "443"))
+# feste Zuordnung wie curl --resolve, z. B. "eu.actual.battle.net=127.0.0.2,…" (Benchmarks/Tests)
+RESOLVE_OVERRIDES = dict(kv.split("=", 1) for kv in os.environ.get("RESOLVE_OVERRIDES", "").split(",") if "=" in kv)
 
 # =========================
 # Hilfsfunktionen
@@ -45,54 +88,845 @@ def read_json(p: Path, default):
     try: return json.loads(p.read_text(encoding="utf-8"))
     except Exception: return default
 
+def write_bytes(p: Path, data: bytes):
+    # atomar: erst .tmp schreiben, dann ersetzen
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, p)
+
 def write_json(p: Path, obj):
-    p.write_text(json.dumps(obj, ensure_ascii=False, separators=(",",":")), encoding="utf-8")
+    write_bytes(p, json.dumps(obj, ensure_ascii=False, separators=(",",":")).encode("utf-8"))
+
+# =========================
+# State-Store: ein Laden zu Beginn, ein atomarer Commit am Ende
+# =========================
+STORE_DOCS = (MIDS_FILE, LAST_FILE, DIGEST_FILE, LAT_FILE, SKETCH_FILE, STATE_FILE, CHANGELOG,
+              PLATFORM_CACHE, SOURCES_FILE, HTTP_CACHE, KI_INDEX)
+
+class StateStore:
+    """
+    Alle JSON-Zustände eines Laufs in einer SQLite-Datenbank (WAL, Tabelle kv).
+    get/put arbeiten nur im Speicher (als JSON-Text, jedes get liefert ein frisches Objekt wie
+    früher read_json); commit() schreibt alle geänderten Dokumente in einer Transaktion.
+    Stürzt ein Lauf ab, bleibt der vorige konsistente Stand erhalten.
+    Fehlt ein Dokument in der DB, wird einmalig die alte JSON-Datei importiert.
+    history.bin, Feed und Sparkline bleiben eigene Dateien; ihre Writes werden per defer()
+    vorgemerkt und erst nach einem erfolgreichen commit() ausgeführt, rollback() verwirft beides.
+    Laufen Cron und Daemon parallel, gewinnt je Dokument der erste Commit: was ein anderer Prozess
+    seit unserem Laden geschrieben hat, wird übernommen statt überschrieben.
+    """
+    def __init__(self, path=STATE_DB, legacy=STORE_DOCS):
+        self.path, self.legacy = Path(path), legacy
+        self._lock = threading.Lock()
+        self._text = None   # key -> aktueller JSON-Text
+        self._raw  = {}     # key -> JSON-Text wie in der DB
+        self._after = []    # Datei-Writes, die erst nach dem Commit laufen
+
+    @staticmethod
+    def key(name):
+        return name.stem if isinstance(name, Path) else str(name)
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, ts REAL NOT NULL)")
+        return con
+
+    def _load(self):
+        con = self._connect()
+        try:
+            self._raw = dict(con.execute("SELECT key, value FROM kv"))
+        finally:
+            con.close()
+        self._text = dict(self._raw)
+        for p in self.legacy:
+            if self.key(p) not in self._text and (obj := read_json(p, None)) is not None:
+                self._text[self.key(p)] = json.dumps(obj, ensure_ascii=False, separators=(",",":"))
+
+    def load(self):
+        with self._lock:
+            self._load()
+            self._after = []
+        return self
+
+    def defer(self, fn):
+        with self._lock:
+            self._after.append(fn)
+
+    def rollback(self):
+        # abgebrochener Durchlauf (Daemon): puts und vorgemerkte Datei-Writes verwerfen, DB neu lesen
+        with self._lock:
+            self._load()
+            self._after = []
+
+    def get(self, name, default=None):
+        with self._lock:
+            if self._text is None: self._load()
+            raw = self._text.get(self.key(name))
+        return default if raw is None else json.loads(raw)
+
+    def put(self, name, obj):
+        raw = json.dumps(obj, ensure_ascii=False, separators=(",",":"))
+        with self._lock:
+            if self._text is None: self._load()
+            self._text[self.key(name)] = raw
+
+    def commit(self):
+        """
+        Schreibt geänderte Dokumente atomar, danach die vorgemerkten Datei-Writes.
+        Liefert die Anzahl geschriebener Schlüssel.
+        """
+        n = self._commit()
+        with self._lock:
+            after, self._after = self._after, []
+        for fn in after:
+            fn()
+        return n
+
+    def _commit(self):
+        with self._lock:
+            if self._text is None: return 0
+            dirty = {k: v for k, v in self._text.items() if self._raw.get(k) != v}
+            if not dirty: return 0
+            con = self._connect()
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                # unter der Schreibsperre neu lesen: fremde Änderungen seit dem Laden nicht überschreiben
+                stored = dict(con.execute("SELECT key, value FROM kv"))
+                theirs = {k: v for k, v in stored.items() if self._raw.get(k) != v}
+                conflicts = sorted(k for k in theirs if k in dirty)
+                for k in conflicts:
+                    del dirty[k]
+                now = time.time()
+                con.executemany("INSERT OR REPLACE INTO kv (key, value, ts) VALUES (?, ?, ?)",
+                                [(k, v, now) for k, v in dirty.items()])
+                con.execute("COMMIT")
+                # WAL zurück in die Hauptdatei, damit der Workflow eine vollständige state.db committet
+                con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception:
+                if con.in_transaction: con.execute("ROLLBACK")
+                raise
+            finally:
+                con.close()
+            self._raw.update(dirty)
+            self._raw.update(theirs)
+            self._text.update(theirs)
+            if conflicts:
+                print("State: parallel geändert, übernommen statt überschrieben: " + ", ".join(conflicts), flush=True)
+            return len(dirty)
+
+STORE = StateStore()
+
+# =========================
+# Instrumentierung: Zeitspannen pro Lauf + Export
+# =========================
+METRICS_JSONL = os.environ.get("METRICS_JSONL", "").strip()   # optional: jede Lauf-Zeile anhängen
+METRICS_PROM  = os.environ.get("METRICS_PROM", "").strip()    # optional: node_exporter-Textfile
+
+class Spans:
+    """
+    Sammelt die Zeitspannen eines Laufs (Stages, Probes, HTTP-Anfragen, Rendern, Discord).
+    Threadsicher; reset() zu Beginn jedes Laufs bzw. Daemon-Durchlaufs.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.t0, self.wall0, self.items = time.perf_counter(), time.time(), []
+
+    def add(self, name, **attrs):
+        rec = {"name": name, "start_ms": round((time.perf_counter()-self.t0)*1000.0, 1), **attrs}
+        with self._lock:
+            self.items.append(rec)
+        return rec
+
+    @contextmanager
+    def span(self, name, **attrs):
+        t0 = time.perf_counter()
+        rec = {"name": name, **attrs}
+        try:
+            yield rec
+        except BaseException as e:
+            rec["error"] = type(e).__name__
+            raise
+        finally:
+            rec["start_ms"] = round((t0-self.t0)*1000.0, 1)
+            rec["ms"] = round((time.perf_counter()-t0)*1000.0, 1)
+            with self._lock:
+                self.items.append(rec)
+
+SPANS = Spans()
+span  = SPANS.span
+
+def _redact(url):
+    # Webhook-Token gehört nicht in Metriken oder Logs (Fehlertexte von requests enthalten die URL)
+    return re.sub(r"(/webhooks/[^/]+/)[^/?]+", r"\1***", url)
+
+def _prom_text(rec):
+    def lbl(**kv): return "{" + ",".join(f'{k}="{v}"' for k, v in kv.items()) + "}"
+    lines = [
+        "# TYPE ow_status_run_seconds gauge",
+        f"ow_status_run_seconds{lbl(mode=rec.get('mode', 'failed'))} {rec['total_ms']/1000:.3f}",
+        "# TYPE ow_status_last_run_timestamp_seconds gauge",
+        f"ow_status_last_run_timestamp_seconds {rec['t']}",
+        "# TYPE ow_status_stage_seconds gauge",
+    ]
+    lines += [f"ow_status_stage_seconds{lbl(stage=s['stage'])} {s['ms']/1000:.3f}"
+              for s in rec["spans"] if s["name"] == "stage"]
+    lines.append("# TYPE ow_status_stage_fresh gauge")
+    lines += [f"ow_status_stage_fresh{lbl(stage=n)} {int(o == 'fresh')}" for n, o in rec.get("origin", {}).items()]
+    hosts = {}
+    for s in rec["spans"]:
+        if s["name"] != "http": continue
+        h = hosts.setdefault(re.sub(r"^\w+://([^/:]+).*$", r"\1", s["url"]), [0, 0.0, 0, 0])
+        h[0] += 1; h[1] += s["ms"]; h[2] += s.get("bytes", 0)
+        h[3] += int("error" in s or s.get("status", 0) >= 400)
+    for metric, i, fmt in (("requests", 0, "{}"), ("seconds", 1, "{:.3f}"), ("bytes", 2, "{}"), ("errors", 3, "{}")):
+        lines.append(f"# TYPE ow_status_http_{metric} gauge")
+        lines += [f"ow_status_http_{metric}{lbl(host=h)} " + fmt.format(v[i]/1000 if i == 1 else v[i])
+                  for h, v in sorted(hosts.items())]
+    return "\n".join(lines) + "\n"
+
+def write_metrics(**fields):
+    """
+    Kompakter Datensatz des Laufs nach METRICS_FILE; optional als JSON-Zeile (METRICS_JSONL)
+    und als Prometheus-Textfile (METRICS_PROM, atomar ersetzt für den Textfile-Collector).
+    """
+    with SPANS._lock:
+        items = sorted(SPANS.items, key=lambda s: s["start_ms"])
+    rec = {"t": int(SPANS.wall0), "total_ms": round((time.perf_counter()-SPANS.t0)*1000.0, 1), **fields, "spans": items}
+    write_json(METRICS_FILE, rec)
+    if METRICS_JSONL:
+        with open(METRICS_JSONL, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False, separators=(",",":")) + "\n")
+    if METRICS_PROM:
+        tmp = Path(METRICS_PROM + ".tmp")
+        tmp.write_text(_prom_text(rec), encoding="utf-8")
+        os.replace(tmp, METRICS_PROM)
+    return rec
+
+# =========================
+# HTTP: gepoolte Session + Conditional-GET-Cache
+# =========================
+HTTP_POOL = int(os.environ.get("HTTP_POOL", "16"))
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_HTTP_CACHE_LOCK = threading.Lock()
+
+def http_session():
+    # eine Session für alle Quellen: Keep-Alive + Connection-Pool pro Host, threadsicher genug für GET/HEAD
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests, requests.adapters
+            s = requests.Session()
+            s.headers.update(UA)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL, pool_maxsize=HTTP_POOL)
+            adapter.poolmanager.pool_classes_by_scheme = _timed_pool_classes()
+            s.mount("https://", adapter); s.mount("http://", adapter)
+            _SESSION = s
+    return _SESSION
+
+_CONN = threading.local()   # Aufbauzeiten der zuletzt in diesem Thread geöffneten Verbindung
+
+def _timed_pool_classes():
+    """
+    urllib3-Pools, deren Verbindungen DNS über RESOLVER auflösen (gemeinsamer Cache) und
+    DNS/Connect/TLS getrennt messen. Wiederverwendete Keep-Alive-Verbindungen melden nichts.
+    """
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class Timed:
+        def _new_conn(self):
+            host = self._dns_host
+            t0 = time.perf_counter()
+            addrs = [] if ":" in host or re.fullmatch(r"[\d.]+", host) else RESOLVER.resolve(host)
+            t1 = time.perf_counter()
+            if addrs: self._dns_host = addrs[0][1][0]
+            try:
+                sock = super()._new_conn()
+            finally:
+                self._dns_host = host
+            _CONN.t = {"dns_ms": round((t1-t0)*1000.0, 1), "connect_ms": round((time.perf_counter()-t1)*1000.0, 1)}
+            return sock
+
+        def connect(self):
+            t0 = time.perf_counter()
+            super().connect()
+            t = getattr(_CONN, "t", None)
+            if t is not None and isinstance(self, HTTPSConnection):
+                t["tls_ms"] = round(max((time.perf_counter()-t0)*1000.0 - t["dns_ms"] - t["connect_ms"], 0.0), 1)
+
+    class TimedHTTPConnection(Timed, HTTPConnection): pass
+    class TimedHTTPSConnection(Timed, HTTPSConnection): pass
+    class TimedHTTPPool(HTTPConnectionPool):   ConnectionCls = TimedHTTPConnection
+    class TimedHTTPSPool(HTTPSConnectionPool): ConnectionCls = TimedHTTPSConnection
+    return {"http": TimedHTTPPool, "https": TimedHTTPSPool}
+
+def http_request(method, url, **kw):
+    """
+    Alle ausgehenden HTTP-Anfragen laufen hierüber: ein Span je Anfrage mit TTFB, Gesamtzeit,
+    Bytes, Status und – bei neuer Verbindung – DNS/Connect/TLS.
+    """
+    _CONN.t = None
+    with span("http", method=method, url=_redact(url)) as sp:
+        t0 = time.perf_counter()
+        r = http_session().request(method, url, stream=True, **kw)
+        sp["ttfb_ms"] = round((time.perf_counter()-t0)*1000.0, 1)
+        sp["status"] = r.status_code
+        sp["bytes"] = len(r.content)
+        if _CONN.t: sp.update(_CONN.t)
+    return r
+
+def _http_cache_update(url, entry):
+    with _HTTP_CACHE_LOCK:
+        cache = STORE.get(HTTP_CACHE, {})
+        cache[url] = entry
+        STORE.put(HTTP_CACHE, cache)
+
+def cached_parse(url, name, parse, timeout, check=True, inputs=()):
+    """
+    GET mit If-None-Match/If-Modified-Since. Das Ergebnis von parse(text) wird je Body-Hash
+    unter `name` gemerkt: 304 (oder gleicher Body ohne Validator) = null Parse-Arbeit.
+    Bodies werden nicht gespeichert – fehlt bei 304 das Parse-Ergebnis, wird unbedingt neu geladen.
+    inputs: alles außer dem Body, wovon das Ergebnis abhängt (z. B. Keywords aus der Konfig);
+    es geht zusammen mit HTML_PARSER in den Schlüssel, eine Konfig-Änderung parst also neu.
+    """
+    name += "@" + hashlib.sha256(json.dumps([HTML_PARSER, inputs], sort_keys=True).encode()).hexdigest()[:12]
+    with _HTTP_CACHE_LOCK:
+        entry = STORE.get(HTTP_CACHE, {}).get(url, {})
+    parsed = entry.get("parsed", {})
+    headers = {}
+    if name in parsed:
+        if entry.get("etag"):          headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+    r = http_request("GET", url, timeout=timeout, headers=headers)
+    if r.status_code == 304 and name in parsed:
+        return parsed[name]
+    if r.status_code != 200:
+        if check: r.raise_for_status()
+        return parse(r.text)   # z. B. Fehlerseite: parsen, aber nicht cachen
+
+    body_hash = hashlib.sha256(r.content).hexdigest()
+    if body_hash != entry.get("hash"):
+        parsed = {}
+    elif name in parsed:
+        return parsed[name]
+    result = parse(r.text)
+    parsed[name] = result
+    _http_cache_update(url, {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "hash": body_hash,
+        "parsed": parsed,
+    })
+    return result
 
 # =========================
 # Messung: TCP / Ping
 # =========================
-REGION_HOSTS = {
+REGION_HOSTS = TARGETS.get("regions") or {
     "EU":   ["eu.actual.battle.net", "overwatch.blizzard.com"],
     "NA":   ["us.actual.battle.net", "overwatch.blizzard.com"],
     "ASIA": ["kr.actual.battle.net", "overwatch.blizzard.com"],
 }
-REGIONS = [r for r in REGIONS if r in REGION_HOSTS] or ["EU","NA","ASIA"]
+REGIONS = [r for r in REGIONS if r in REGION_HOSTS] or list(REGION_HOSTS)
+
+# weitere Zielgruppen (andere Spiele/Dienste) mit je eigenem Embed; Regions-Schlüssel im Plan: "Gruppe/Region"
+#   "groups": {"Diablo IV": {"title": "Diablo IV", "warn_ms": 300, "regions": {"EU": ["host", …], …}}, …}
+TARGET_GROUPS = TARGETS.get("groups", {})
+
+def group_regions():
+    return {f"{g}/{r}": hosts for g, cfg in TARGET_GROUPS.items() for r, hosts in cfg.get("regions", {}).items()}
+
+def thresholds_for(key):
+    # (INFO_MS, WARN_MS) – Gruppen dürfen eigene Schwellen setzen
+    cfg = TARGET_GROUPS.get(key.split("/", 1)[0], {}) if "/" in key else {}
+    return cfg.get("info_ms", INFO_MS), cfg.get("warn_ms", WARN_MS)
+
+class Resolver:
+    """
+    DNS-Cache pro Lauf: jeder Host wird nur einmal aufgelöst (auch bei parallelen Samples),
+    Fehler werden kurz negativ gecacht. dns_ms hält die Dauer der letzten echten Auflösung.
+    """
+    def __init__(self, ttl=DNS_TTL, neg_ttl=DNS_NEG_TTL, static=None):
+        self.ttl, self.neg_ttl = ttl, neg_ttl
+        self.static = dict(RESOLVE_OVERRIDES if static is None else static)
+        self.dns_ms = {}
+        self._cache = {}   # host -> (gültig_bis, [(family, sockaddr), ...])
+        self._locks = {}
+        self._lock  = threading.Lock()
+
+    def _hit(self, host):
+        hit = self._cache.get(host)
+        return hit[1] if hit and hit[0] > time.monotonic() else None
 
-def tcp_ms(host, port=443, timeout=3.0):
-    t0 = time.time()
+    def resolve(self, host):
+        if ip := self.static.get(host):
+            return [(socket.AF_INET6 if ":" in ip else socket.AF_INET, (ip, PROBE_PORT))]
+        with self._lock:
+            if (addrs := self._hit(host)) is not None: return addrs
+            lk = self._locks.setdefault(host, threading.Lock())
+        with lk:
+            if (addrs := self._hit(host)) is not None: return addrs
+            t0 = time.perf_counter()
+            try:
+                infos = socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+                addrs, ttl = list(dict.fromkeys((fam, sa) for fam, _, _, _, sa in infos)), self.ttl
+            except OSError:
+                addrs, ttl = [], self.neg_ttl
+            self.dns_ms[host] = round((time.perf_counter()-t0)*1000.0, 1)
+            self._cache[host] = (time.monotonic() + ttl, addrs)
+            return addrs
+
+RESOLVER = Resolver()
+
+class Probe(float):
+    """
+    Ein Sample: der Wert ist wie bisher die TCP-Connect-Zeit in ms (Aggregation, Sketches und
+    Quorum bleiben unverändert), dazu die Phasen derselben Verbindung (None = nicht gemessen).
+    """
+    def __new__(cls, connect_ms, tls_ms=None, ttfb_ms=None, status=None):
+        obj = super().__new__(cls, connect_ms)
+        obj.tls_ms, obj.ttfb_ms, obj.status = tls_ms, ttfb_ms, status
+        return obj
+
+    def __reduce__(self):   # für die Worker-Prozesse
+        return (Probe, (float(self), self.tls_ms, self.ttfb_ms, self.status))
+
+PROBE_PHASES = {"tcp": 1, "tls": 2, "http": 3}   # Phasen je Probe, jede bis zu PROBE_TIMEOUT
+_TLS_CTX = None
+
+def _tls_ctx():
+    # Probe, kein Datenabruf: Handshake-Zeit messen, Zertifikat nicht prüfen (Probe-Hosts sind teils reine Endpunkte)
+    global _TLS_CTX
+    if _TLS_CTX is None:
+        import ssl
+        ctx = ssl.create_default_context()
+        ctx.check_hostname, ctx.verify_mode = False, ssl.CERT_NONE
+        _TLS_CTX = ctx
+    return _TLS_CTX
+
+def _probe_phases(sock, host, connect, mode):
+    # TLS-Handshake und ggf. HEAD / auf der schon offenen Verbindung; Fehler kosten nur die späteren Phasen
+    t0 = time.perf_counter()
+    try:
+        tls_sock = _tls_ctx().wrap_socket(sock, server_hostname=host)
+    except OSError:
+        return Probe(connect)
     try:
-        with socket.create_connection((host, port), timeout=timeout):
-            return round((time.time()-t0)*1000.0, 1)
+        tls = round((time.perf_counter()-t0)*1000.0, 1)
+        if mode != "http":
+            return Probe(connect, tls)
+        t1 = time.perf_counter()
+        tls_sock.sendall(f"HEAD / HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {UA['User-Agent']}\r\nConnection: close\r\n\r\n".encode())
+        head = tls_sock.recv(64)
+        ttfb = round((time.perf_counter()-t1)*1000.0, 1)
+        m = re.match(rb"HTTP/\d(?:\.\d)? (\d{3})", head)
+        return Probe(connect, tls, ttfb if head else None, int(m.group(1)) if m else None)
     except OSError:
+        return Probe(connect, tls)
+    finally:
+        tls_sock.close()
+
+def tcp_ms(host, port=None, timeout=3.0, mode=None, on_connect=None):
+    # DNS kommt aus dem Cache, gemessen wird der TCP-Connect (monotone Uhr), je nach Modus + TLS/TTFB.
+    # on_connect bekommt die Connect-Zeit sofort – noch bevor TLS/TTFB fertig sind.
+    port = PROBE_PORT if port is None else port
+    mode = PROBE_MODE if mode is None else mode
+    for fam, sa in RESOLVER.resolve(host):
+        s = socket.socket(fam, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        try:
+            t0 = time.perf_counter()
+            s.connect((sa[0], port) + tuple(sa[2:]))
+            connect = round((time.perf_counter()-t0)*1000.0, 1)
+            if on_connect: on_connect(connect)
+            return connect if mode == "tcp" else _probe_phases(s, host, connect, mode)
+        except OSError:
+            continue
+        finally:
+            s.close()
+    return None
+
+_DEST_SEMS = {}
+_DEST_LOCK = threading.Lock()
+
+def _bounded_probe(host, port, timeout, t_end, on_connect=None):
+    # höchstens PROBE_PER_DEST gleichzeitige Connects je Ziel-IP (viele Hostnamen teilen sich CDN-IPs)
+    addrs = RESOLVER.resolve(host)
+    dest = addrs[0][1][0] if addrs else host
+    with _DEST_LOCK:
+        sem = _DEST_SEMS.setdefault(dest, threading.BoundedSemaphore(PROBE_PER_DEST))
+    if not sem.acquire(timeout=max(t_end - time.monotonic(), 0)):
         return None
+    try:
+        return tcp_ms(host, port, timeout, on_connect=on_connect)
+    finally:
+        sem.release()
 
-def aggregate_region(hosts):
-    vals = []
-    total = 0
-    for h in hosts:
-        for _ in range(max(SAMPLES, 1)):
-            total += 1
-            if (m := tcp_ms(h)) is not None:
-                vals.append(m)
+def _run_probes_local(jobs, deadline):
+    # Probes, die an der Deadline noch in TLS/TTFB hängen, zählen mit ihrem Connect (langsam, nicht Loss)
+    t_end = time.monotonic() + deadline
+    connected = [None] * len(jobs)
+    ex = ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(jobs)))
+    futs = [ex.submit(_bounded_probe, h, PROBE_PORT, min(PROBE_TIMEOUT, deadline), t_end,
+                      lambda ms, i=i: connected.__setitem__(i, ms)) for i, h in enumerate(jobs)]
+    done, _ = wait(futs, timeout=max(t_end - time.monotonic(), 0))
+    ex.shutdown(wait=False, cancel_futures=True)
+    return [f.result() if f in done else None if connected[i] is None else Probe(connected[i])
+            for i, f in enumerate(futs)]
+
+PROC_IPC_S = 0.3   # Reserve, damit Shard-Ergebnisse vor der Deadline beim Elternprozess ankommen
+PROC_START_MAX_S = float(os.environ.get("PROC_START_MAX_S", "2"))   # so lange (≤ ¼ der Deadline) auf kalte Worker warten
+_PROC_POOL = None
+_PROC_READY = []
+
+def _proc_pool():
+    global _PROC_POOL, _PROC_READY
+    if _PROC_POOL is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn statt fork: der Elternprozess hat zu diesem Zeitpunkt schon laufende Threads
+        _PROC_POOL = ProcessPoolExecutor(PROBE_PROCS, mp_context=multiprocessing.get_context("spawn"))
+        _PROC_READY = [_PROC_POOL.submit(os.getpid) for _ in range(PROBE_PROCS)]   # Worker hochfahren
+    return _PROC_POOL
+
+def warm_probe_pool(n_jobs):
+    # Worker-Prozesse schon beim Planen starten; Spawn + Import kosten bei jedem Cron-Lauf Zeit
+    if PROBE_PROCS > 1 and n_jobs >= PROBE_SHARD_MIN:
+        _proc_pool()
+
+def _pool_ready(timeout=0):
+    # True, sobald alle Worker hochgefahren sind; wartet höchstens timeout Sekunden
+    return _PROC_POOL is not None and not wait(_PROC_READY, timeout=max(timeout, 0))[1]
+
+def _probe_shard(jobs, t_end_wall, port, static, mode):
+    # läuft im Worker-Prozess; Adressen kommen schon aufgelöst aus dem Elternprozess.
+    # Deadline als Wall-Clock: ein spät gestarteter Worker hat entsprechend weniger Zeit, nicht mehr.
+    global PROBE_PORT, PROBE_MODE
+    PROBE_PORT, PROBE_MODE = port, mode
+    RESOLVER.static.update(static)
+    return _run_probes_local(jobs, max(t_end_wall - time.time(), 0))
+
+def run_probes(jobs, deadline=None):
+    """
+    Feuert alle Probes (Liste von Hosts, Duplikate = weitere Samples) gleichzeitig ab.
+    Liefert pro Job ms oder None – was bis zur Gesamt-Deadline nicht fertig ist, zählt als Loss.
+    Ab PROBE_SHARD_MIN Probes und PROBE_PROCS > 1 werden die Jobs nach Ziel-IP auf Worker-Prozesse
+    verteilt (gleiche IP -> gleicher Shard, damit PROBE_PER_DEST auch dann gilt). Auf kalte Worker
+    (jeder Cron-Lauf) wird kurz gewartet, die Wartezeit geht von der Deadline ab; sind sie dann
+    noch nicht da, läuft die Runde im Prozess.
+    """
+    if not jobs: return []
+    deadline = PROBE_DEADLINE if deadline is None else deadline
+    t_end = time.monotonic() + deadline
+    if PROBE_PROCS <= 1 or len(jobs) < PROBE_SHARD_MIN or not _pool_ready(min(PROC_START_MAX_S, deadline / 4)):
+        return _run_probes_local(jobs, max(t_end - time.monotonic(), 0))
+    static = {h: addrs[0][1][0] for h in dict.fromkeys(jobs) if (addrs := RESOLVER.resolve(h))}
+    shards = {}
+    for i, h in enumerate(jobs):
+        shards.setdefault(zlib.crc32(static.get(h, h).encode()) % PROBE_PROCS, []).append(i)
+    t_end_wall = time.time() + max(t_end - time.monotonic() - PROC_IPC_S, 0)
+    pool = _proc_pool()
+    futs = {pool.submit(_probe_shard, [jobs[i] for i in idx], t_end_wall, PROBE_PORT, static, PROBE_MODE): idx
+            for idx in shards.values()}
+    done, _ = wait(futs, timeout=max(t_end - time.monotonic(), 0))
+    out = [None] * len(jobs)
+    for f in done:
+        if f.exception() is None:
+            for i, m in zip(futs[f], f.result()):
+                out[i] = m
+    return out
+
+_T975 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26,
+         10: 2.23, 12: 2.18, 15: 2.13, 20: 2.09, 30: 2.04}   # Student-t, zweiseitig 95 %
+
+def mean_ci(vals):
+    # halbe Breite des 95%-Konfidenzintervalls des Mittelwerts (None bei < 2 Werten)
+    if len(vals) < 2: return None
+    df = len(vals) - 1
+    t = _T975[max(k for k in _T975 if k <= df)] if df < 30 else 1.96
+    return t * statistics.stdev(vals) / math.sqrt(len(vals))
+
+def wilson(k, n, z=1.96):
+    # Wilson-Intervall für den Anteil k/n (Loss), robust auch bei kleinem n
+    if not n: return (0.0, 1.0)
+    p = k / n
+    mid = (p + z*z/(2*n)) / (1 + z*z/n)
+    half = z * math.sqrt(p*(1-p)/n + z*z/(4*n*n)) / (1 + z*z/n)
+    return (max(mid - half, 0.0), min(mid + half, 1.0))
+
+def samples_confident(samples):
+    """
+    Genug Samples? Loss: Wilson-KI schmal genug (kein oder nur Loss gilt als eindeutig).
+    Latenz: 95%-KI des Mittelwerts höchstens ±max(CI_REL·Ø, CI_ABS_MS).
+    """
+    vals = [m for m in samples if m is not None]
+    lost = len(samples) - len(vals)
+    if 0 < lost < len(samples):
+        lo, hi = wilson(lost, len(samples))
+        if hi - lo > LOSS_CI_WIDTH: return False
+    if not vals: return True
+    ci = mean_ci(vals)
+    return ci is not None and ci <= max(CI_REL * statistics.fmean(vals), CI_ABS_MS)
+
+def summarize_samples(samples):
+    vals = [m for m in samples if m is not None]
+    total = len(samples)
+    lo, hi = wilson(total - len(vals), total)
+    conf = {"n": total, "ci_ms": None, "loss_ci": [round(lo*100), round(hi*100)]}
     if not vals:
         loss_pct = 100
-        return {"min":None, "avg":None, "max":None, "jitter":None, "loss_pct":loss_pct}
+        return {"min":None, "avg":None, "p50":None, "max":None, "jitter":None, "loss_pct":loss_pct, **conf}
     loss_pct = round((total - len(vals)) / total * 100) if total else 0
     jitter = round(statistics.pstdev(vals), 1) if len(vals) > 1 else 0.0
-    return {
-        "min": min(vals),
+    ci = mean_ci(vals)
+    conf["ci_ms"] = round(ci, 1) if ci is not None else None
+    out = {
+        "min": float(min(vals)),
         "avg": round(sum(vals) / len(vals), 1),
-        "max": max(vals),
+        "p50": round(statistics.median(vals), 1),
+        "max": float(max(vals)),
         "jitter": jitter,
         "loss_pct": loss_pct,
+        **conf,
+    }
+    # Phasen aus PROBE_MODE tls/http: wo entsteht die Latenz (Connect, Handshake, Server)?
+    for phase in ("tls_ms", "ttfb_ms"):
+        got = [getattr(m, phase) for m in vals if getattr(m, phase, None) is not None]
+        if got: out[phase.replace("_ms", "_avg")] = round(sum(got) / len(got), 1)
+    return out
+
+def build_probe_plan(region_hosts, extra_hosts=(), samples=None, adaptive=None):
+    """
+    Dedupliziert identische Hosts über alle Regionen (+ z. B. Plattform-Hosts, je 1 Sample):
+    jeder Host wird genau einmal geprobt, die Ergebnisse gehen an alle Regionen zurück.
+    adaptive: samples ist nur die erste Charge, siehe execute_probe_plan.
+    """
+    n = max(SAMPLES if samples is None else samples, 1)
+    plan = {h: n for hosts in region_hosts.values() for h in hosts}
+    for h in extra_hosts:
+        plan.setdefault(h, 1)
+    return {"samples": plan, "regions": region_hosts,
+            "adaptive": ADAPTIVE_SAMPLING if adaptive is None else adaptive}
+
+def _probe_round(jobs, per_host, deadline):
+    for h, m in zip(jobs, run_probes(jobs, deadline)):
+        per_host[h].append(m)
+
+def execute_probe_plan(plan):
+    """
+    Feste Charge je Host; im adaptiven Modus danach weitere Runden (gleiche Chargengröße) nur
+    für Regionen, deren Werte noch nicht samples_confident sind – bis SAMPLES_MAX_REGION oder
+    bis das Budget (PROBE_DEADLINE) keine volle Runde (alle Phasen des PROBE_MODE) mehr zulässt.
+    """
+    jobs = [h for h, n in plan["samples"].items() for _ in range(n)]
+    per_host = {h: [] for h in plan["samples"]}
+    t_end = time.monotonic() + PROBE_DEADLINE
+    with span("probes", jobs=len(jobs)) as sp:
+        _probe_round(jobs, per_host, PROBE_DEADLINE)
+        rounds = 1
+        while plan.get("adaptive"):
+            left = t_end - time.monotonic()
+            if left < PROBE_TIMEOUT * PROBE_PHASES.get(PROBE_MODE, 1): break   # Runde muss alle Phasen schaffen
+            more = {}
+            for hosts in plan["regions"].values():
+                region = [m for h in hosts for m in per_host[h]]
+                batch = sum(plan["samples"][h] for h in hosts)
+                if samples_confident(region) or len(region) + batch > SAMPLES_MAX_REGION:
+                    continue
+                for h in hosts:
+                    more[h] = plan["samples"][h]
+            if not more: break
+            extra = [h for h, n in more.items() for _ in range(n)]
+            _probe_round(extra, per_host, left)
+            jobs += extra; rounds += 1
+        sp.update(jobs=len(jobs), rounds=rounds)
+    for h, ms in per_host.items():
+        ok = [m for m in ms if m is not None]
+        phases = {k: v for k, v in summarize_samples(ms).items() if k in ("tls_avg", "ttfb_avg")}
+        SPANS.add("tcp", host=h, n=len(ms), ok=len(ok), dns_ms=RESOLVER.dns_ms.get(h),
+                  connect_ms=round(sum(ok)/len(ok), 1) if ok else None, **phases)
+    return per_host
+
+def aggregate_regions(region_hosts, samples=None, per_host=None):
+    if per_host is None:
+        per_host = execute_probe_plan(build_probe_plan(region_hosts, samples=samples))
+    return {
+        r: summarize_samples([m for h in hosts for m in per_host.get(h, [])])
+        for r, hosts in region_hosts.items()
     }
 
-def severity_from_latency(avg):
+def aggregate_region(hosts):
+    return aggregate_regions({"_": hosts})["_"]
+
+# =========================
+# Latenz-Verlauf: Streaming-Quantile (Log-Bucket-Histogramme)
+# =========================
+SKETCH_ERR   = 0.02    # relativer Fehler der Quantile
+TREND_MIN_MS = float(os.environ.get("TREND_MIN_MS", "20"))
+# Basis für Severity/Trend, gezählt in Läufen (Cron: Stunden, Daemon: Minuten), nicht in Uhr-Slots
+SEVERITY_RUNS      = max(int(os.environ.get("SEVERITY_RUNS", "3")), 1)
+SEVERITY_MAX_AGE_S = float(os.environ.get("SEVERITY_MAX_AGE_S", str(4*3600)))   # ältere Läufe zählen nicht
+RUN_P50_DOC = "run_p50"   # STORE: je Region [[ts, p50], …] der letzten SEVERITY_RUNS Läufe
+_SK_LOG_GAMMA = math.log((1 + SKETCH_ERR) / (1 - SKETCH_ERR))
+# Slot-Ringe je Serie: Stunden-Slots für 1h/24h, Tages-Slots für 7d
+_SK_RINGS   = {"h": (3600, 24), "d": (86400, 7)}
+_SK_WINDOWS = {"1h": ("h", 1), "24h": ("h", 24), "7d": ("d", 7)}
+
+class LatencySketches:
+    """
+    Pro Serie (region:EU, region:Gruppe/NA, host:…) HDR-artige Histogramme mit logarithmischen Buckets
+    (≤ ~330 Buckets zwischen 0.1 ms und 60 s), verteilt auf 24 Stunden- und 7 Tages-Slots.
+    Speicher und Dateigröße sind damit fest begrenzt, egal wie lange der Bot läuft.
+    """
+    def __init__(self, data=None):
+        self.data = data or {}
+
+    @classmethod
+    def load(cls, path=SKETCH_FILE):
+        return cls(STORE.get(path, {}))
+
+    def save(self, path=SKETCH_FILE, now=None):
+        now = time.time() if now is None else now
+        for key in list(self.data):
+            self._expire(key, now)
+            if not any(self.data[key].values()):
+                del self.data[key]
+        STORE.put(path, self.data)
+
+    @staticmethod
+    def _bucket(ms):
+        return math.ceil(math.log(min(max(ms, 0.1), 60000.0)) / _SK_LOG_GAMMA)
+
+    @staticmethod
+    def _value(idx):
+        return 2 * math.exp(idx * _SK_LOG_GAMMA) / (1 + math.exp(_SK_LOG_GAMMA))
+
+    def _expire(self, key, now):
+        series = self.data.setdefault(key, {r: [] for r in _SK_RINGS})
+        for ring, (span, keep) in _SK_RINGS.items():
+            cur = int(now // span)
+            series[ring] = [sl for sl in series.get(ring, []) if sl[0] > cur - keep]
+        return series
+
+    def add(self, key, samples, now=None):
+        now = time.time() if now is None else now
+        vals = [m for m in samples if m is not None]
+        if not vals: return
+        series = self._expire(key, now)
+        for ring, (span, _) in _SK_RINGS.items():
+            cur = int(now // span)
+            slots = series[ring]
+            if not slots or slots[-1][0] != cur:
+                slots.append([cur, {}])
+            buckets = slots[-1][1]
+            for m in vals:
+                b = str(self._bucket(m))
+                buckets[b] = buckets.get(b, 0) + 1
+
+    def quantiles(self, key, window, qs=(0.5, 0.95, 0.99), now=None):
+        now = time.time() if now is None else now
+        ring, n = _SK_WINDOWS[window]
+        cur = int(now // _SK_RINGS[ring][0])
+        merged = {}
+        for sid, buckets in self.data.get(key, {}).get(ring, []):
+            if sid > cur - n:
+                for b, c in buckets.items():
+                    merged[int(b)] = merged.get(int(b), 0) + c
+        total = sum(merged.values())
+        if not total: return None
+        out, order = {"n": total}, sorted(merged.items())
+        for q in qs:
+            rank, cum = max(math.ceil(q * total), 1), 0   # Nearest-Rank
+            for idx, c in order:
+                cum += c
+                if cum >= rank: break
+            out[f"p{round(q*100)}"] = round(self._value(idx), 1)
+        return out
+
+    def series(self, key, ring, n, q=0.5, now=None):
+        """q-Quantil je Slot für die letzten n Slots eines Rings (älteste zuerst, None = keine Daten)."""
+        now = time.time() if now is None else now
+        cur = int(now // _SK_RINGS[ring][0])
+        slots = dict((sid, b) for sid, b in self.data.get(key, {}).get(ring, []))
+        out = []
+        for sid in range(cur - n + 1, cur + 1):
+            order = sorted((int(b), c) for b, c in slots.get(sid, {}).items())
+            total = sum(c for _, c in order)
+            if not total:
+                out.append(None); continue
+            rank, cum = max(math.ceil(q * total), 1), 0
+            for idx, c in order:
+                cum += c
+                if cum >= rank: break
+            out.append(round(self._value(idx)))
+        return out
+
+def latency_percentiles(sketches, key):
+    return {w: sketches.quantiles(key, w) for w in _SK_WINDOWS}
+
+def latency_trend(cur, pct, n_run=0):
+    # Severity-Basis (siehe latency_basis) gegen 24h-p50; Band wächst mit der Streuung (p95-p50) des Tages
+    day = pct.get("24h")
+    if cur is None or not day or day["n"] <= n_run: return "•"
+    band = max(TREND_MIN_MS, (day["p95"] - day["p50"]) / 2)
+    if cur > day["p50"] + band: return "▲"
+    if cur < day["p50"] - band: return "▼"
+    return "→"
+
+def recent_runs(regions, fresh=True, now=None):
+    """
+    p50 je Lauf und Region (älteste zuerst), inkl. des aktuellen Laufs, wenn seine Probes frisch sind.
+    Nur berechnet – gespeichert wird mit STORE.put(RUN_P50_DOC, …) vom Aufrufer.
+    """
+    now = time.time() if now is None else now
+    doc = STORE.get(RUN_P50_DOC, {})
+    out = {}
+    for r, v in regions.items():
+        runs = [e for e in doc.get(r, []) if now - e[0] <= SEVERITY_MAX_AGE_S]
+        if fresh and v.get("p50") is not None:
+            runs.append([int(now), v["p50"]])
+        out[r] = runs[-SEVERITY_RUNS:]
+    return out
+
+def latency_basis(v, runs):
+    """
+    Severity-Basis einer Region: der p50 dieses Laufs, wenn er eindeutig ist (Mittelwert-KI schmal
+    wie bei samples_confident) – eine echte Verschlechterung zeigt sich so sofort. Sonst der Median
+    der p50 der letzten SEVERITY_RUNS Läufe: jeder Lauf zählt einmal, egal wie viele Samples das
+    adaptive Sampling ihm gegeben hat, ein einzelner verrauschter Lauf kippt die Ampel also nicht.
+    """
+    if v["avg"] is None: return None
+    if not runs or (v["ci_ms"] is not None and v["ci_ms"] <= max(CI_REL * v["avg"], CI_ABS_MS)):
+        return v.get("p50")
+    return round(statistics.median(p for _, p in runs), 1)
+
+LAT_BUCKET_MS   = float(os.environ.get("LAT_BUCKET_MS", "25"))    # Latenz-Auflösung für die Änderungserkennung
+LOSS_BUCKET_PCT = int(os.environ.get("LOSS_BUCKET_PCT", "25"))
+MIN_REFRESH_S   = float(os.environ.get("MIN_REFRESH_S", "21600"))  # volatile Felder spätestens alle 6h
+
+def latency_bucket(avg):
+    return None if avg is None else int(avg // LAT_BUCKET_MS)
+
+def severity_from_latency(avg, info_ms=None, warn_ms=None):
+    info_ms = INFO_MS if info_ms is None else info_ms
+    warn_ms = WARN_MS if warn_ms is None else warn_ms
     if avg is None:        return "unknown"
-    if avg >= WARN_MS:     return "warn"
-    if avg >= INFO_MS:     return "info"
+    if avg >= warn_ms:     return "warn"
+    if avg >= info_ms:     return "info"
     return "ok"
 
+def region_severities(regions, runs):
+    # Severity aus Medianen (latency_basis) statt aus einem einzelnen Mittelwert
+    return {r: severity_from_latency(latency_basis(v, runs.get(r)), *thresholds_for(r)) for r, v in regions.items()}
+
 def worst_state(states):
     return max(states, key=lambda s: ORDER.get(s,0))
 
@@ -104,44 +938,165 @@ KNOWN_ISSUES_JSON = "https://us.forums.blizzard.com/en/overwatch/c/overwatch-2/k
 NEWS_INDEX_URL = "https://overwatch.blizzard.com/en-us/news"
 MAINT_DATE_RE = re.compile(r"(?:(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\w*,?\s*)?(\d{1,2})\s*(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*[, ]+\s*(\d{4})", re.I)
 
+KI_FORUM_URL  = "https://us.forums.blizzard.com/en/overwatch/c/overwatch-2/known-issues/64"
+KI_MAX_PAGES  = int(os.environ.get("KI_MAX_PAGES", "10"))
+KI_KEEP_S     = 8*86400   # Index hält etwas mehr als das 7T-Fenster
+
+def _known_issues_topics(text):
+    # pro Seite nur das Nötige: [ts, title, slug, id, pinned] + ob es weitere Seiten gibt
+    tl = json.loads(text).get("topic_list", {})
+    out = []
+    for t in tl.get("topics", []):
+        t_iso = t.get("last_posted_at") or t.get("created_at") or t.get("bumped_at")
+        if not t_iso: continue
+        try:
+            ts = datetime.datetime.fromisoformat(t_iso.replace("Z","+00:00")).timestamp()
+        except Exception:
+            ts = 0.0
+        out.append([ts, t.get("title"), t.get("slug"), t.get("id"), bool(t.get("pinned"))])
+    return {"topics": out, "more": bool(tl.get("more_topics_url"))}
+
+def sync_known_issues(index, now_ts=None, deadline=10.0):
+    """
+    Inkrementeller Abgleich des lokalen Topic-Index (id -> [ts, title, slug]).
+    Die Kategorie ist nach letzter Aktivität sortiert: es wird nur weitergeblättert, bis ein
+    bekanntes, unverändertes (nicht angepinntes) Topic kommt oder das 7T-Fenster verlassen ist.
+    Bricht der Abgleich ab, blättert der nächste Lauf ohne Abkürzung bis zum Fensterende.
+    """
+    now_ts = time.time() if now_ts is None else now_ts
+    t_end = time.monotonic() + deadline
+    topics, cutoff = index.setdefault("topics", {}), now_ts - KI_KEEP_S
+    shortcut, complete = index.get("complete", False), False
+    for page in range(KI_MAX_PAGES):
+        url = KNOWN_ISSUES_JSON + (f"?page={page}" if page else "")
+        try:
+            data = cached_parse(url, "index", _known_issues_topics, timeout=min(8, max(t_end - time.monotonic(), 1)))
+        except Exception:
+            if page == 0: raise
+            break
+        reached_known = reached_old = False
+        for ts, title, slug, tid, pinned in data["topics"]:
+            key = str(tid)
+            if pinned:
+                topics[key] = [ts, title, slug]
+                continue
+            if shortcut and key in topics and topics[key][0] == ts:
+                reached_known = True
+            if ts < cutoff:
+                reached_old = True
+                continue
+            topics[key] = [ts, title, slug]
+        if reached_known or reached_old or not data["more"]:
+            complete = True
+            break
+        if time.monotonic() >= t_end:
+            break
+    index["complete"] = complete
+    index["topics"] = {k: v for k, v in topics.items() if v[0] >= cutoff}
+    return index
+
 def fetch_known_issues_summary():
     try:
-        r = requests.get(KNOWN_ISSUES_JSON, timeout=12, headers=UA)
-        r.raise_for_status()
-        data = r.json()
-        topics = data.get("topic_list", {}).get("topics", [])
+        index = sync_known_issues(STORE.get(KI_INDEX, {}))
+        STORE.put(KI_INDEX, index)
         now_ts = time.time()
-        day_ago = now_ts - 24*3600
-        cnt_24h, last_title, last_slug, last_id, last_ts = 0, None, None, None, 0.0
-        for t in topics:
-            t_iso = t.get("last_posted_at") or t.get("created_at") or t.get("bumped_at")
-            if not t_iso: continue
-            try:
-                ts = datetime.datetime.fromisoformat(t_iso.replace("Z","+00:00")).timestamp()
-            except Exception:
-                ts = 0.0
-            if ts >= day_ago: cnt_24h += 1
-            if ts > last_ts:
-                last_ts   = ts
-                last_title= t.get("title")
-                last_slug = t.get("slug")
-                last_id   = t.get("id")
-        last_url = f"https://us.forums.blizzard.com/en/overwatch/t/{last_slug}/{last_id}" if last_slug and last_id else "https://us.forums.blizzard.com/en/overwatch/c/overwatch-2/known-issues/64"
-        return cnt_24h, (last_title or "—"), last_url
+        cnt_24h = sum(1 for ts, _, _ in index["topics"].values() if ts >= now_ts - 24*3600)
+        cnt_7d  = sum(1 for ts, _, _ in index["topics"].values() if ts >= now_ts - 7*86400)
+        last = max(index["topics"].items(), key=lambda kv: kv[1][0], default=None)
+        if last and last[1][2]:
+            tid, (_, last_title, last_slug) = last
+            last_url = f"https://us.forums.blizzard.com/en/overwatch/t/{last_slug}/{tid}"
+        else:
+            last_title, last_url = None, KI_FORUM_URL
+        return cnt_24h, (last_title or "—"), last_url, cnt_7d
     except Exception:
-        return None, None, "https://us.forums.blizzard.com/en/overwatch/c/overwatch-2/known-issues/64"
+        return None, None, KI_FORUM_URL, None
+
+# =========================
+# Streaming-Extraktion (Tokenizer statt BeautifulSoup-Baum)
+# =========================
+HTML_PARSER = os.environ.get("HTML_PARSER", "stream")   # "stream" oder "soup" (alter Vollparse)
+
+class _StopScan(Exception):
+    pass
+
+class _TextScanner(HTMLParser):
+    # wie soup.get_text(" "): sichtbarer Text ohne script/style/template/Kommentare
+    SKIP = {"script", "style", "template"}
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts, self._skip = [], 0
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP: self._skip += 1
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip: self._skip -= 1
+    def handle_data(self, data):
+        if not self._skip: self.parts.append(data)
+
+class _NewsScanner(HTMLParser):
+    """
+    Sucht den ersten ItemList/NewsArticle-Eintrag in ld+json und bricht dort sofort ab.
+    Der erste /news/-Link wird unterwegs gemerkt (Fallback wie im Vollparse, ld+json hat Vorrang).
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found, self.link = None, None
+        self._ld, self._a = None, None   # ld+json-Puffer / [href, Textteile, img-alt] des offenen Links
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            if (dict(attrs).get("type") or "").strip().lower() == "application/ld+json":
+                self._ld = []
+        elif tag == "a" and self.link is None and self._a is None:
+            href = dict(attrs).get("href") or ""
+            if "/news/" in href and not href.rstrip("/").endswith("/news"):
+                self._a = [href, [], None]
+        elif tag == "img" and self._a is not None and self._a[2] is None:
+            self._a[2] = dict(attrs).get("alt") or ""
+    def handle_data(self, data):
+        if self._ld is not None: self._ld.append(data)
+        elif self._a is not None: self._a[1].append(data)
+    def handle_endtag(self, tag):
+        if tag == "script" and self._ld is not None:
+            raw, self._ld = "".join(self._ld).strip(), None
+            if raw and (hit := _news_from_ld(raw)):
+                self.found = hit
+                raise _StopScan
+        elif tag == "a" and self._a is not None:
+            href, parts, alt = self._a
+            self._a = None
+            title = "".join(p.strip() for p in parts if p.strip()) or alt
+            if title:
+                self.link = (title, _absolute_overwatch_url(href))
+
+def _scan(scanner, html, chunk=65536):
+    try:
+        for i in range(0, len(html), chunk):
+            scanner.feed(html[i:i+chunk])
+        scanner.close()
+    except _StopScan:
+        pass
+    return scanner
+
+def html_text(html):
+    if HTML_PARSER == "soup":
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, "html.parser").get_text(" ")
+    return " ".join(_scan(_TextScanner(), html).parts)
+
+MAINT_KEYWORDS = TARGETS.get("maintenance", {"game": "overwatch", "keywords": ["maintenance","downtime","scheduled"]})
+
+def parse_maintenance_hint(html):
+    text = html_text(html)
+    lw = text.lower()
+    if MAINT_KEYWORDS["game"] in lw and any(k in lw for k in MAINT_KEYWORDS["keywords"]):
+        m = MAINT_DATE_RE.search(text)
+        when = f"{m.group(2)} {m.group(3)} {m.group(4)}" if m else "Termin auf Seite"
+        return "warn", f"Wartungshinweis gefunden ({when})."
+    return "ok", "Keine expliziten OW-Wartungshinweise."
 
 def fetch_maintenance_hint():
     try:
-        html = requests.get(MAINT_URL, timeout=20, headers=UA).text
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(" ")
-        lw = text.lower()
-        if "overwatch" in lw and any(k in lw for k in ["maintenance","downtime","scheduled"]):
-            m = MAINT_DATE_RE.search(text)
-            when = f"{m.group(2)} {m.group(3)} {m.group(4)}" if m else "Termin auf Seite"
-            return "warn", f"Wartungshinweis gefunden ({when})."
-        return "ok", "Keine expliziten OW-Wartungshinweise."
+        return tuple(cached_parse(MAINT_URL, "hint", parse_maintenance_hint, timeout=20, check=False, inputs=MAINT_KEYWORDS))
     except Exception:
         return "unknown", "Wartungsseite nicht prüfbar."
 
@@ -152,66 +1107,84 @@ def _absolute_overwatch_url(url: str) -> str:
         return f"https://overwatch.blizzard.com{url}"
     return f"{NEWS_INDEX_URL.rstrip('/')}/{url.lstrip('/')}"
 
-def fetch_latest_news():
+def _news_from_ld(raw):
     try:
-        r = requests.get(NEWS_INDEX_URL, timeout=20, headers=UA)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
+        data = json.loads(raw)
+    except Exception:
+        return None
 
-        for script in soup.find_all("script", type="application/ld+json"):
-            raw = (script.string or "").strip()
-            if not raw:
-                continue
-            try:
-                data = json.loads(raw)
-            except Exception:
-                continue
+    candidates = []
+    if isinstance(data, dict):
+        if data.get("@type") == "ItemList":
+            candidates = data.get("itemListElement", [])
+        elif data.get("@type") == "NewsArticle":
+            candidates = [data]
+    elif isinstance(data, list):
+        for entry in data:
+            if isinstance(entry, dict) and entry.get("@type") == "ItemList":
+                candidates = entry.get("itemListElement", [])
+                break
 
-            candidates = []
-            if isinstance(data, dict):
-                if data.get("@type") == "ItemList":
-                    candidates = data.get("itemListElement", [])
-                elif data.get("@type") == "NewsArticle":
-                    candidates = [data]
-            elif isinstance(data, list):
-                for entry in data:
-                    if isinstance(entry, dict) and entry.get("@type") == "ItemList":
-                        candidates = entry.get("itemListElement", [])
-                        break
-
-            for item in candidates:
-                target = item.get("item") if isinstance(item, dict) else None
-                if isinstance(target, dict):
-                    title = target.get("name") or target.get("headline")
-                    url = target.get("url")
-                elif isinstance(item, dict) and item.get("@type") == "NewsArticle":
-                    title = item.get("headline") or item.get("name")
-                    url = item.get("url")
-                else:
-                    continue
-                if title and url:
-                    return title.strip(), _absolute_overwatch_url(url)
+    for item in candidates:
+        target = item.get("item") if isinstance(item, dict) else None
+        if isinstance(target, dict):
+            title = target.get("name") or target.get("headline")
+            url = target.get("url")
+        elif isinstance(item, dict) and item.get("@type") == "NewsArticle":
+            title = item.get("headline") or item.get("name")
+            url = item.get("url")
+        else:
+            continue
+        if title and url:
+            return title.strip(), _absolute_overwatch_url(url)
+    return None
 
-        for link in soup.select("a[href]"):
-            href = link.get("href", "")
-            if "/news/" not in href:
-                continue
-            if href.rstrip("/").endswith("/news"):
-                continue
-            title = link.get_text(strip=True)
-            if not title:
-                img = link.find("img")
-                title = img.get("alt") if img else ""
-            if title:
-                return title, _absolute_overwatch_url(href)
-        return None, NEWS_INDEX_URL
+def parse_latest_news_soup(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        raw = (script.string or "").strip()
+        if not raw:
+            continue
+        if hit := _news_from_ld(raw):
+            return hit
+
+    for link in soup.select("a[href]"):
+        href = link.get("href", "")
+        if "/news/" not in href:
+            continue
+        if href.rstrip("/").endswith("/news"):
+            continue
+        title = link.get_text(strip=True)
+        if not title:
+            img = link.find("img")
+            title = img.get("alt") if img else ""
+        if title:
+            return title, _absolute_overwatch_url(href)
+    return None, NEWS_INDEX_URL
+
+def parse_latest_news(html):
+    # Streaming zuerst; findet der nichts (oder scheitert), der alte Vollparse als Fallback
+    if HTML_PARSER != "soup":
+        try:
+            sc = _scan(_NewsScanner(), html)
+            if hit := sc.found or sc.link:
+                return hit
+        except Exception:
+            pass
+    return parse_latest_news_soup(html)
+
+def fetch_latest_news():
+    try:
+        return tuple(cached_parse(NEWS_INDEX_URL, "latest", parse_latest_news, timeout=20))
     except Exception:
         return None, NEWS_INDEX_URL
 
 # =========================
 # Plattform-Status (robuste Signals + Quorum + Cache)
 # =========================
-PLATFORM_SIGNALS = {
+PLATFORM_SIGNALS = TARGETS.get("platforms") or {
     "PlayStation": {
         "hosts": ["store.playstation.com", "api.playstation.com", "playstation.com"],
         "urls":  ["https://store.playstation.com", "https://api.playstation.com", "https://playstation.com"],
@@ -239,34 +1212,41 @@ PLATFORM_SIGNALS = {
 }
 
 def _dns_ok(host, timeout=3.0):
-    try:
-        socket.getaddrinfo(host, 443)
-        return True
-    except OSError:
-        return False
+    return bool(RESOLVER.resolve(host))
 
-def _tcp_ok(host, timeout=3.0):
-    try:
-        with socket.create_connection((host, 443), timeout=timeout):
-            return True
-    except OSError:
-        return False
+def _tcp_ok(host, timeout=3.0, probes=None):
+    # Ergebnis aus dem gemeinsamen Probe-Plan wiederverwenden, sonst selbst verbinden
+    if probes and host in probes:
+        return any(m is not None for m in probes[host])
+    return tcp_ms(host, timeout=timeout) is not None
+
+def _probed_http(urls, probes):
+    """
+    HTTP-Signal aus den Probes (PROBE_MODE "http" = HEAD / ohne Redirects). Regel wie _http_ok, daher
+    nur für konfigurierte URLs, die genau die Wurzel eines Hosts sind, und nur bei 200 – alles andere
+    (Redirect, 4xx, keine Probe) ist keine Aussage (None) und geht an den normalen HEAD auf cfg["urls"].
+    """
+    from urllib.parse import urlsplit
+    roots = [u.hostname for u in map(urlsplit, urls) if u.scheme == "https" and u.path in ("", "/") and not u.query]
+    got = [getattr(m, "status", None) for h in roots for m in (probes or {}).get(h, [])]
+    return True if 200 in got else None
 
 def _http_ok(url, timeout=6):
     try:
-        r = requests.head(url, timeout=timeout, allow_redirects=True, headers=UA)
+        r = http_request("HEAD", url, timeout=timeout, allow_redirects=True)
         return r.status_code in (200, 301, 302, 303, 307, 308)
     except Exception:
         return False
 
 def _status_page_hint(url, ok_kw, warn_kw, bad_kw):
-    try:
-        r = requests.get(url, timeout=8, headers=UA)
-        t = (r.text or "").lower()
+    def parse(text):
+        t = (text or "").lower()
         if any(k in t for k in bad_kw):  return "warn"
         if any(k in t for k in warn_kw): return "info"
         if any(k in t for k in ok_kw):   return "ok"
         return "unknown"
+    try:
+        return cached_parse(url, "hint", parse, timeout=8, check=False, inputs=[ok_kw, warn_kw, bad_kw])
     except Exception:
         return "unknown"
 
@@ -276,35 +1256,85 @@ def platform_icon(state: str) -> str:
 def state_icon(state: str) -> str:
     return {"ok":"🟢","info":"🟡","warn":"🟠","unknown":"⚪️"}.get(state, "⚪️")
 
-def robust_platform_status_overview(pc_state: str):
+PLATFORM_DEADLINE = float(os.environ.get("PLATFORM_DEADLINE", "12"))   # Wall-Clock aller Plattform-Checks (s)
+HEDGE_AFTER_S     = float(os.environ.get("HEDGE_AFTER_S", "1.5"))       # danach zweite, identische Anfrage
+
+def _result(fut, timeout, default):
+    try: return fut.result(timeout=max(timeout, 0))
+    except Exception: return default
+
+def _hedged(fn, *args, delay=None):
+    # hängt die erste Anfrage länger als `delay`, startet eine zweite – die schnellere gewinnt
+    first = _in_thread(lambda: fn(*args))
+    if wait([first], timeout=HEDGE_AFTER_S if delay is None else delay)[0]:
+        return first.result()
+    second = _in_thread(lambda: fn(*args))
+    done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+    return next(iter(done)).result()
+
+def _any_true(fn, items, t_end):
+    # alle Hosts/URLs gleichzeitig, True beim ersten Treffer
+    pending = {_in_thread(lambda x=x: fn(x)) for x in items}
+    while pending:
+        done, pending = wait(pending, timeout=max(t_end - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        if not done: return False
+        if any(_result(f, 0, False) for f in done): return True
+    return False
+
+def _quorum_state(cfg, probes, t_end):
+    """
+    DNS/TCP/HTTP laufen parallel; entschieden wird, sobald das Quorum feststeht:
+    2 Erfolge -> OK (Rest wird nicht abgewartet). Die Statusseite wird erst geholt, wenn
+    2 Signals gescheitert sind, OK also nicht mehr erreichbar ist. Regeln wie bisher:
+    WARN = Seite 'Down' + <=1 Erfolg, INFO = Seite 'eingeschränkt' + 0 Erfolge, sonst UNKNOWN.
+    """
+    left = lambda: t_end - time.monotonic()
+    pending = {
+        _in_thread(lambda: _any_true(_dns_ok, cfg["hosts"], t_end)),
+        _in_thread(lambda: _any_true(lambda h: _tcp_ok(h, probes=probes), cfg["hosts"], t_end)),
+        _in_thread(lambda: _any_true(lambda u: _hedged(_http_ok, u), cfg["urls"], t_end)
+                   if (probed := _probed_http(cfg["urls"], probes)) is None else probed),
+    }
+    ok_count = fail_count = 0
+    page = hint = None
+    while True:
+        if ok_count >= 2:
+            return "ok"
+        if fail_count >= 2 and page is None:
+            page = _in_thread(lambda: _hedged(_status_page_hint, cfg["status_url"], cfg["ok_kw"], cfg["warn_kw"], cfg["bad_kw"]))
+        if page is not None and hint is None and (page.done() or not pending):
+            hint = _result(page, left(), "unknown")
+        if hint is not None:
+            if hint == "warn": return "warn"
+            if hint != "info" or ok_count > 0: return "unknown"
+            if not pending: return "info"   # INFO braucht 0 Erfolge -> letztes Signal abwarten
+        if not pending:
+            return "unknown"
+        done, _ = wait(pending | ({page} if page is not None and hint is None else set()),
+                       timeout=max(left(), 0), return_when=FIRST_COMPLETED)
+        if not done:
+            # Deadline: offene Signals zählen als gescheitert
+            fail_count, pending = fail_count + len(pending), set()
+            continue
+        for f in done & pending:
+            pending.discard(f)
+            if _result(f, 0, False): ok_count += 1
+            else: fail_count += 1
+
+def check_platforms(probes=None, deadline=None):
     """
     Mehrere harte Signals (DNS/TCP/HTTP) + Quorum + Cache.
     WARN nur, wenn Statusseite 'Down' meldet UND >=2 harte Checks failen.
     Sonst UNKNOWN. Dadurch kein falsches Rot mehr.
+    Alle Plattformen laufen parallel, Wall-Clock ≈ ein Timeout (PLATFORM_DEADLINE).
     """
-    cache = read_json(PLATFORM_CACHE, {"PC": {}, "PlayStation": {}, "Xbox": {}, "Switch": {}})
+    cache = load_platform_cache()
+    t_end = time.monotonic() + (PLATFORM_DEADLINE if deadline is None else deadline)
+    futs = {name: _in_thread(lambda cfg=cfg: _quorum_state(cfg, probes, t_end)) for name, cfg in PLATFORM_SIGNALS.items()}
 
     out = {}
-    # PC = Gesamtstatus deiner Heuristik
-    out["PC"] = (pc_state, "Overwatch Reachability", "https://overwatch.blizzard.com", None)
-    cache["PC"] = {"state": pc_state, "ts": time.time()}
-
     for name, cfg in PLATFORM_SIGNALS.items():
-        dns_ok  = any(_dns_ok(h)  for h in cfg["hosts"])
-        tcp_ok_ = any(_tcp_ok(h)  for h in cfg["hosts"])
-        http_ok_ = any(_http_ok(u) for u in cfg["urls"])
-        ok_count = sum([dns_ok, tcp_ok_, http_ok_])
-
-        page_hint = _status_page_hint(cfg["status_url"], cfg["ok_kw"], cfg["warn_kw"], cfg["bad_kw"])
-
-        if ok_count >= 2:
-            state = "ok"
-        elif page_hint == "warn" and ok_count <= 1:
-            state = "warn"
-        elif page_hint == "info" and ok_count == 0:
-            state = "info"
-        else:
-            state = "unknown"
+        state = _result(futs[name], t_end - time.monotonic() + 1, "unknown")
 
         age_txt = None
         if state == "unknown":
@@ -317,112 +1347,615 @@ def robust_platform_status_overview(pc_state: str):
         cache[name] = {"state": state, "ts": time.time()}
         out[name] = (state, name, cfg["status_url"], age_txt)
 
-    write_json(PLATFORM_CACHE, cache)
+    STORE.put(PLATFORM_CACHE, cache)
+    return out
+
+def load_platform_cache():
+    return STORE.get(PLATFORM_CACHE, {name: {} for name in ("PC", *PLATFORM_SIGNALS)})
+
+def cached_platforms():
+    # Fallback, wenn check_platforms sein Timeout verpasst: letzter bekannter Zustand, als cached markiert
+    cache, now = load_platform_cache(), time.time()
+    out = {}
+    for name, cfg in PLATFORM_SIGNALS.items():
+        prev = cache.get(name, {})
+        age = int((now - prev["ts"]) / 60) if prev.get("state") and prev.get("ts") else None
+        out[name] = (prev.get("state") or "unknown", name, cfg["status_url"], age)
+    return out
+
+def robust_platform_status_overview(pc_state: str, probes=None, checked=None):
+    # PC = Gesamtstatus deiner Heuristik; Konsolen aus check_platforms (ggf. schon als Stage gelaufen)
+    checked = check_platforms(probes) if checked is None else checked
+    cache = load_platform_cache()
+    cache["PC"] = {"state": pc_state, "ts": time.time()}
+    STORE.put(PLATFORM_CACHE, cache)
+    out = {"PC": (pc_state, "Overwatch Reachability", "https://overwatch.blizzard.com", None)}
+    out.update({name: tuple(v) for name, v in checked.items()})
     return out
 
 # =========================
 # Verlauf / Sparkline / Changelog
 # =========================
+UPTIME_WINDOWS   = {"24h": 24*3600, "7d": 7*86400, "30d": 30*86400, "90d": 90*86400}
+HISTORY_CAPACITY = int(os.environ.get("HISTORY_CAPACITY", str(366*24)))   # ein Jahr Stundenwerte
+
+class HistoryStore:
+    """
+    Append-only Ringpuffer mit festen 5-Byte-Records (t:uint32, ok:uint8).
+    Der Header hält je Uptime-Fenster (Tail-Index, ok-Summe); beim Append wandern die Tails
+    nur über herausgefallene Records -> Uptime-Abfrage O(1), Append amortisiert O(1).
+    """
+    MAGIC = b"OWH1"
+    HEAD  = struct.Struct("<4sIQ")   # magic, capacity, total (alle je geschriebenen Records)
+    WIN   = struct.Struct("<QQ")     # tail (absoluter Index), ok-Summe
+    REC   = struct.Struct("<IB")
+
+    def __init__(self, path, capacity=HISTORY_CAPACITY, windows=UPTIME_WINDOWS, fileobj=None):
+        self.path, self.windows = Path(path), dict(windows)
+        self._data_off = self.HEAD.size + self.WIN.size * len(self.windows)
+        if fileobj is None and not self.path.exists():
+            self.path.write_bytes(self.HEAD.pack(self.MAGIC, capacity, 0) + self.WIN.pack(0, 0) * len(self.windows))
+        self._f = fileobj or open(self.path, "r+b")
+        magic, self.capacity, self.total = self.HEAD.unpack(self._f.read(self.HEAD.size))
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.path}: kein History-Store")
+        self._win = {k: list(self.WIN.unpack(self._f.read(self.WIN.size))) for k in self.windows}
+
+    def close(self):
+        self._f.close()
+
+    def _read(self, idx):
+        self._f.seek(self._data_off + (idx % self.capacity) * self.REC.size)
+        return self.REC.unpack(self._f.read(self.REC.size))
+
+    def _write_header(self):
+        self._f.seek(0)
+        self._f.write(self.HEAD.pack(self.MAGIC, self.capacity, self.total)
+                      + b"".join(self.WIN.pack(*self._win[k]) for k in self.windows))
+
+    def append(self, t, ok, flush=True):
+        t, ok = int(t), 1 if ok else 0
+        if self.total >= self.capacity:
+            # der älteste Record wird gleich überschrieben -> aus allen Fenstern austragen
+            evicted = self.total - self.capacity
+            old_ok = self._read(evicted)[1]
+            for w in self._win.values():
+                if w[0] <= evicted:
+                    w[0], w[1] = evicted + 1, w[1] - old_ok
+        self._f.seek(self._data_off + (self.total % self.capacity) * self.REC.size)
+        self._f.write(self.REC.pack(t, ok))
+        self.total += 1
+        for name, span in self.windows.items():
+            w = self._win[name]
+            w[1] += ok
+            while w[0] < self.total - 1 and self._read(w[0])[0] <= t - span:
+                w[1] -= self._read(w[0])[1]
+                w[0] += 1
+        if flush:
+            self._write_header()
+            self._f.flush()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def uptime(self, window):
+        tail, ok_sum = self._win[window]
+        n = self.total - tail
+        return round(ok_sum / n * 100) if n else 0
+
+    def uptimes(self):
+        return {k: self.uptime(k) for k in self.windows}
+
+    def tail(self, n):
+        # die letzten n Records (älteste zuerst) im alten history.json-Format
+        first = max(self.total - min(n, len(self)), 0)
+        return [{"t": t, "ok": ok} for t, ok in (self._read(i) for i in range(first, self.total))]
+
+def open_history():
+    fresh = not HIST_BIN.exists()
+    store = HistoryStore(HIST_BIN)
+    if fresh and HIST_FILE.exists():
+        # einmalige Migration aus history.json (die Datei bleibt unangetastet liegen)
+        for e in read_json(HIST_FILE, []):
+            store.append(e["t"], e["ok"], flush=False)
+        store._write_header()
+    return store
+
 def append_history(is_ok: bool):
-    hist = read_json(HIST_FILE, [])
-    hist.append({"t": int(time.time()), "ok": 1 if is_ok else 0})
-    hist = hist[-168:]
-    write_json(HIST_FILE, hist)
-    return hist
-
-def uptimes(hist):
-    if not hist: return (0,0)
-    last24 = hist[-24:] if len(hist)>=24 else hist
-    u24 = round(sum(x["ok"] for x in last24)/len(last24)*100)
-    u7  = round(sum(x["ok"] for x in hist)/len(hist)*100)
-    return (u24, u7)
-
-def render_sparkline(hist):
-    try:
-        from PIL import Image, ImageDraw
-        if not hist: return
-        w,h = 420,60
-        img = Image.new("RGB",(w,h),(24,26,27))
-        d = ImageDraw.Draw(img)
-        d.rectangle([0,0,w-1,h-1], outline=(60,60,60))
-        n = max(2,len(hist)); step = (w-16)/(n-1)
-        pts=[(8+i*step, 10+(1-e["ok"])*(h-20)) for i,e in enumerate(hist)]
-        d.line(pts,width=2)
-        u24,u7 = uptimes(hist)
-        d.text((10,h-14),f"Uptime 24h: {u24}% • 7T: {u7}%",fill=(200,200,200))
-        SPARK_PATH.parent.mkdir(parents=True,exist_ok=True)
-        img.save(SPARK_PATH)
-    except Exception:
-        pass
+    """
+    Liefert den Verlauf inkl. des neuen Samples als Kopie im Speicher (für Uptime/Sparkline);
+    history.bin selbst wird erst nach STORE.commit() fortgeschrieben.
+    """
+    t = time.time()
+    open_history().close()   # ggf. Migration aus history.json
+    store = HistoryStore(HIST_BIN, fileobj=io.BytesIO(HIST_BIN.read_bytes()))
+    store.append(t, is_ok)
+    def persist():
+        disk = open_history()
+        try: disk.append(t, is_ok)
+        finally: disk.close()
+    STORE.defer(persist)
+    return store
+
+def uptimes(store):
+    if not len(store): return (0,0)
+    return (store.uptime("24h"), store.uptime("7d"))
 
 def save_changelog_change(old_state,new_state):
     if old_state==new_state: return
-    cl = read_json(CHANGELOG,[])
+    cl = STORE.get(CHANGELOG,[])
     cl.append({"t": now_utc_str(), "from": old_state, "to": new_state})
-    write_json(CHANGELOG,cl[-6:])
+    STORE.put(CHANGELOG,cl[-6:])
 
 def last_changelog_lines(n=2):
-    cl = read_json(CHANGELOG,[])
+    cl = STORE.get(CHANGELOG,[])
     if not cl: return "—"
     return " • ".join(f"{e['t']} → {e['to'].upper()}" for e in cl[-n:])
 
+# =========================
+# Chart: Uptime + Latenz je Region, gerendert nur bei geänderten Daten
+# =========================
+SPARK_DOC = "sparkline"   # STORE-Schlüssel: Hash der zuletzt gezeichneten Daten
+SPARK_VERSION = 2         # erhöhen, wenn sich das Aussehen ändert -> einmal neu zeichnen
+# Fenster -> Uptime-Buckets (Breite s, Anzahl) und Latenz-Slots (Sketch-Ring, Anzahl)
+SPARK_WINDOWS = {"24h": ((3600, 24), ("h", 24)), "7T": ((6*3600, 28), ("d", 7))}
+REGION_COLORS = [(52,152,219), (231,76,60), (155,89,182), (230,126,34), (26,188,156)]
+
+def downsample(points, bucket_s, n, now=None, agg=None):
+    """[(t, v)] -> n an der Uhr ausgerichtete Buckets (älteste zuerst), leere Buckets = None."""
+    now = time.time() if now is None else now
+    agg = agg or (lambda vs: sum(vs) / len(vs))
+    first = int(now // bucket_s) - n + 1
+    buckets = [[] for _ in range(n)]
+    for t, v in points:
+        i = int(t // bucket_s) - first
+        if 0 <= i < n and v is not None:
+            buckets[i].append(v)
+    return [agg(b) if b else None for b in buckets]
+
+def sparkline_data(store, sketches, regions=None, now=None):
+    # eine Datengrundlage für alle Fenster; gerundet, damit Rauschen keinen neuen Hash erzeugt
+    now = time.time() if now is None else now
+    regions = REGIONS if regions is None else regions
+    longest = max(bs * n for (bs, n), _ in SPARK_WINDOWS.values())
+    hist = [(e["t"], e["ok"]) for e in store.tail(2 * longest // 3600) if e["t"] > now - longest]
+    data = {}
+    for win, ((bs, n), (ring, slots)) in SPARK_WINDOWS.items():
+        up = downsample(hist, bs, n, now)
+        data[win] = {
+            "up":  [None if u is None else round(u * 100) for u in up],
+            "lat": {r: sketches.series(f"region:{r}", ring, slots, now=now) for r in regions},
+        }
+    return data
+
+def _draw_sparkline(data, labels):
+    from PIL import Image, ImageDraw
+    pw, ph, pad = 300, 110, 8
+    img = Image.new("RGB", (pw * len(data), ph + 18), (24,26,27))
+    d = ImageDraw.Draw(img)
+    lat_max = max(max((v for w in data.values() for vs in w["lat"].values() for v in vs if v is not None), default=0), 1)
+    for i, (win, w) in enumerate(data.items()):
+        x0, x1, top, bottom = i*pw + pad, (i+1)*pw - pad, 14, ph - 14
+        d.rectangle([i*pw, 0, (i+1)*pw - 1, ph - 1], outline=(60,60,60))
+        d.text((x0, 2), win, fill=(200,200,200))
+        # Uptime als Streifen am unteren Rand (grün -> rot)
+        n = len(w["up"]); bw = (x1 - x0) / n
+        for j, u in enumerate(w["up"]):
+            if u is None: continue
+            col = (int(231 - 185*u/100), int(76 + 128*u/100), int(60 + 53*u/100))
+            d.rectangle([x0 + j*bw, bottom + 4, x0 + (j+1)*bw - 1, ph - 4], fill=col)
+        # Latenz-Linien je Region (gemeinsame Skala über alle Fenster)
+        for k, vs in enumerate(w["lat"].values()):
+            step = (x1 - x0) / max(len(vs) - 1, 1)
+            pts = [(x0 + j*step, bottom - (v / lat_max) * (bottom - top)) for j, v in enumerate(vs) if v is not None]
+            if len(pts) > 1:   d.line(pts, fill=REGION_COLORS[k % len(REGION_COLORS)], width=2)
+            elif pts:          d.ellipse([pts[0][0]-2, pts[0][1]-2, pts[0][0]+2, pts[0][1]+2], fill=REGION_COLORS[k % len(REGION_COLORS)])
+    x = 4
+    for k, r in enumerate(next(iter(data.values()))["lat"]):
+        d.text((x, ph + 3), r, fill=REGION_COLORS[k % len(REGION_COLORS)]); x += 8 * len(r) + 10
+    d.text((x, ph + 3), f"max {lat_max} ms · {labels}", fill=(200,200,200))
+    return img
+
+def render_sparkline(store, sketches=None):
+    """
+    Zeichnet Uptime und p50-Latenz je Region für alle SPARK_WINDOWS in ein PNG.
+    Gerendert (und nach dem Commit atomar ersetzt) wird nur, wenn sich der Daten-Hash gegenüber dem im State
+    gemerkten ändert. Liefert den Hash (für ein cache-sicheres Bild-URL) oder None.
+    """
+    try:
+        if not len(store): return None
+        sketches = LatencySketches.load() if sketches is None else sketches
+        u24, u7 = uptimes(store)
+        labels = f"Uptime 24h: {u24}% · 7T: {u7}%"   # "•" fehlt im PIL-Standardfont
+        data = sparkline_data(store, sketches)
+        digest = hashlib.sha256(json.dumps([SPARK_VERSION, data, labels], sort_keys=True).encode()).hexdigest()[:16]
+        if STORE.get(SPARK_DOC, {}).get("hash") == digest and SPARK_PATH.exists():
+            return digest
+        buf = io.BytesIO()
+        _draw_sparkline(data, labels).save(buf, format="PNG")
+        STORE.defer(lambda png=buf.getvalue(): write_bytes(SPARK_PATH, png))   # PNG erst mit dem Commit
+        STORE.put(SPARK_DOC, {"hash": digest, "ts": int(time.time())})
+        return digest
+    except Exception:
+        return None
+
+# =========================
+# Status-Feed: vorab aggregiert, feste Array-Größen, inkrementell fortgeschrieben
+# =========================
+FEED_DOC = "feed"   # STORE: Akkumulatoren je Fenster + letzter Snapshot
+FEED_WINDOWS = {"24h": (3600, 24), "7d": (6*3600, 28), "90d": (86400, 90)}   # Bucket-Breite s, Anzahl
+
+def _shift(arr, k, n):
+    # Ring um k Buckets weiterschieben; passt die Länge nicht (Konfig geändert), neu anfangen
+    if not arr or len(arr) != n: return [[0, 0] for _ in range(n)]
+    return (arr + [[0, 0] for _ in range(k)])[-n:]
+
+def update_feed_series(series, now, up_ok=None, lat=None):
+    """
+    Pro Fenster [Summe, Anzahl] je Bucket für Uptime und Latenz je Region. Jeder Lauf schiebt nur
+    auf den aktuellen Bucket vor und addiert seinen Wert – unabhängig von der Länge der Historie.
+    """
+    lat = {r: v for r, v in (lat or {}).items() if v is not None}
+    for name, (bs, n) in FEED_WINDOWS.items():
+        cur = int(now // bs)
+        win = series.setdefault(name, {})
+        k = min(max(cur - win.get("end", cur), 0), n)
+        win["end"] = cur
+        win["up"] = _shift(win.get("up"), k, n)
+        arrs = win.setdefault("lat", {})
+        for r in list(arrs):
+            arrs[r] = _shift(arrs[r], k, n)
+            if r not in lat and not any(c for _, c in arrs[r]):
+                del arrs[r]
+        if up_ok is not None:
+            win["up"][-1][0] += int(up_ok); win["up"][-1][1] += 1
+        for r, v in lat.items():
+            arr = arrs[r] = _shift(arrs.get(r), 0, n)
+            arr[-1][0] = round(arr[-1][0] + v, 1); arr[-1][1] += 1
+    return series
+
+def feed_series(series):
+    out = {}
+    for name, (bs, n) in FEED_WINDOWS.items():
+        win = series.get(name, {})
+        out[name] = {
+            "bucket_s": bs, "end": (win.get("end", 0) + 1) * bs,   # Ende des letzten Buckets (Unix-Zeit)
+            "up":  [round(s / c * 100) if c else None for s, c in win.get("up", [])],
+            "lat": {r: [round(s / c) if c else None for s, c in arr] for r, arr in win.get("lat", {}).items()},
+        }
+    return out
+
+def update_feed(snapshot=None, uptime=None, up_ok=None, lat=None, now=None):
+    """
+    Schreibt FEED_FILE (ein paar KB, keine Aggregation im Browser nötig): aktueller Snapshot
+    (Zustände, Latenz-Rollups, Plattformen, Changelog …) plus die Fenster-Arrays.
+    Ohne snapshot (Fast-Path) bleibt der letzte Snapshot stehen, nur Uptime/Arrays laufen weiter.
+    """
+    now = time.time() if now is None else now
+    doc = STORE.get(FEED_DOC, {})
+    if snapshot is not None:
+        doc["snapshot"] = snapshot
+    if uptime is not None:
+        doc.setdefault("snapshot", {})["uptime"] = uptime
+    update_feed_series(doc.setdefault("series", {}), now, up_ok, lat)
+    STORE.put(FEED_DOC, doc)
+    feed = {"v": 1, "generated": int(now), **doc.get("snapshot", {}), "series": feed_series(doc["series"])}
+    STORE.defer(lambda: write_json(FEED_FILE, feed))   # Feed nie vor state.db
+    return feed
+
+# =========================
+# Stage-Scheduler (parallele Quellen + Zeitbudget)
+# =========================
+SOURCE_BUDGET = float(os.environ.get("SOURCE_BUDGET", "30"))   # globales Budget aller Quellen (s)
+
+def _in_thread(fn):
+    # Daemon-Thread statt Pool: eine hängende Quelle blockiert weder den Lauf noch das Prozessende
+    fut = Future()
+    def run():
+        if not fut.set_running_or_notify_cancel(): return
+        try: fut.set_result(fn())
+        except BaseException as e: fut.set_exception(e)
+    threading.Thread(target=run, daemon=True).start()
+    return fut
+
+def _timed_stage(name, fn):
+    with span("stage", stage=name):
+        return fn()
+
+def run_stages(stages, budget=None, inputs=None):
+    """
+    stages: {name: {"fn", "timeout", "default", "good"?, "after"?}} – alle Stages starten sofort
+    (default darf eine Funktion sein, sie wird erst im Fallback aufgerufen).
+    "after" reicht das Ergebnis einer anderen Stage als Argument durch (läuft die nicht mit,
+    kommt es aus inputs, z. B. dem letzten Daemon-Durchlauf).
+    Überschreitet eine Stage ihr Timeout bzw. das globale Budget (oder ist das Ergebnis nicht
+    "good"), wird der letzte gute Wert aus SOURCES_FILE genommen, sonst der Default.
+    Liefert (Ergebnisse, Herkunft je Stage: "fresh" / "stale" / "default").
+    """
+    budget = SOURCE_BUDGET if budget is None else budget
+    t0 = time.monotonic()
+    futs = {}
+    for name, st in stages.items():
+        dep = futs.get(st.get("after"))
+        if dep is not None:
+            fn = lambda fn=st["fn"], dep=dep: fn(dep.result())
+        elif st.get("after") and inputs and st["after"] in inputs:
+            fn = lambda fn=st["fn"], v=inputs[st["after"]]: fn(v)
+        else:
+            fn = st["fn"]
+        futs[name] = _in_thread(lambda fn=fn, name=name: _timed_stage(name, fn))
+
+    last_good = STORE.get(SOURCES_FILE, {})
+    results, origin = {}, {}
+    for name in sorted(stages, key=lambda n: stages[n]["timeout"]):
+        st = stages[name]
+        left = t0 + min(st["timeout"], budget) - time.monotonic()
+        try:
+            val = futs[name].result(timeout=max(left, 0))
+            ok = st.get("good", lambda v: True)(val)
+        except Exception:
+            val, ok = None, False
+        if ok:
+            results[name], origin[name] = val, "fresh"
+            if "good" in st:
+                last_good[name] = {"v": val, "ts": time.time()}
+        elif "good" in st and name in last_good:
+            results[name], origin[name] = last_good[name]["v"], "stale"
+        else:
+            results[name], origin[name] = st["default"]() if callable(st["default"]) else st["default"], "default"
+    STORE.put(SOURCES_FILE, last_good)
+    return {n: results[n] for n in stages}, {n: origin[n] for n in stages}
+
+def source_stages(plan):
+    # Quellen ohne "good" (Latenz, Plattformen) haben eigene Fallbacks und werden nicht gecacht
+    return {
+        "latency": {
+            "fn": lambda: execute_probe_plan(plan),
+            "timeout": PROBE_DEADLINE + 2, "default": {},
+        },
+        "platforms": {
+            "fn": check_platforms, "after": "latency",
+            "timeout": PROBE_DEADLINE + PLATFORM_DEADLINE + 2,
+            "default": cached_platforms,
+        },
+        "maintenance": {
+            "fn": fetch_maintenance_hint, "timeout": 20,
+            "good": lambda v: v[0] != "unknown",
+            "default": ("unknown", "Wartungsseite nicht prüfbar."),
+        },
+        "known_issues": {
+            "fn": fetch_known_issues_summary, "timeout": 12,
+            "good": lambda v: v[0] is not None,
+            "default": (None, None, KI_FORUM_URL, None),
+        },
+        "news": {
+            "fn": fetch_latest_news, "timeout": 20,
+            "good": lambda v: v[0] is not None,
+            "default": (None, NEWS_INDEX_URL),
+        },
+    }
+
 # =========================
 # Discord I/O
 # =========================
-def parse_webhook():
+def parse_webhook(url=None):
     from urllib.parse import urlparse
-    parts = urlparse(WEBHOOK).path.strip("/").split("/")
+    parts = urlparse(url or WEBHOOK).path.strip("/").split("/")
     i = parts.index("webhooks")
     return parts[i+1], parts[i+2]
 
+class RateLimiter:
+    """
+    Token-Bucket je Route (Methode + Webhook-ID), gespeist aus Discords X-RateLimit-*-Headern.
+    Routen, die laut X-RateLimit-Bucket denselben Bucket teilen, werden zusammengelegt.
+    Gewartet wird nur im Thread des betroffenen Webhooks – die anderen laufen weiter.
+    """
+    GLOBAL = "__global__"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bucket_of = {}   # route -> Bucket-Hash
+        self._buckets = {}     # Bucket -> [remaining, reset_at (monotonic)]
+
+    def _key(self, route):
+        return self._bucket_of.get(route, route)
+
+    def _wait_time(self, key, now):
+        b = self._buckets.get(key)
+        if b is None or now >= b[1]:
+            return 0.0
+        return 0.0 if b[0] > 0 else b[1] - now
+
+    def acquire(self, route, max_wait=30.0):
+        t_end = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                key = self._key(route)
+                wait_s = max(self._wait_time(key, now), self._wait_time(self.GLOBAL, now))
+                if wait_s <= 0:
+                    if (b := self._buckets.get(key)) and now < b[1]:
+                        b[0] -= 1
+                    return True
+            if now + wait_s > t_end:
+                return False
+            time.sleep(wait_s)
+
+    def update(self, route, r):
+        h, now = r.headers, time.monotonic()
+        with self._lock:
+            if bucket := h.get("X-RateLimit-Bucket"):
+                self._bucket_of[route] = bucket
+            key = self._key(route)
+            if r.status_code == 429:
+                try: retry = float(h.get("Retry-After") or r.json().get("retry_after", 1))
+                except Exception: retry = 1.0
+                scope = self.GLOBAL if (h.get("X-RateLimit-Global") or "").lower() == "true" else key
+                self._buckets[scope] = [0, now + max(retry, 0.05)]
+            elif h.get("X-RateLimit-Remaining") is not None and h.get("X-RateLimit-Reset-After") is not None:
+                self._buckets[key] = [int(h["X-RateLimit-Remaining"]), now + float(h["X-RateLimit-Reset-After"])]
+
+RATE_LIMITER = RateLimiter()
+
 def discord_request(method,url,json_payload):
+    wid, _ = parse_webhook(url)
+    route = f"{method} {wid}"
+    r = None
     for _ in range(4):
-        r = requests.request(method,url,json=json_payload,timeout=20,headers=UA)
+        if not RATE_LIMITER.acquire(route):
+            break
+        r = http_request(method,url,json=json_payload,timeout=20)
+        RATE_LIMITER.update(route, r)
         if r.status_code!=429: return r
-        time.sleep(min(max(float(r.headers.get("Retry-After","1")),1),10))
+    if r is None:
+        raise RuntimeError(f"Discord-Route {route} gedrosselt")
     return r
 
-def send_new(payload):
-    r = discord_request("POST",WEBHOOK+"?wait=true",payload)
+def _webhook_base(url):
+    return url.split("?", 1)[0].rstrip("/")
+
+def send_new(payload, url=None):
+    r = discord_request("POST",_webhook_base(url or WEBHOOK)+"?wait=true",payload)
     r.raise_for_status()
     return r.json()["id"]
 
-def edit_existing(mid,payload):
-    wid,tok = parse_webhook()
-    url=f"https://discord.com/api/webhooks/{wid}/{tok}/messages/{mid}"
-    return discord_request("PATCH",url,payload)
+def edit_existing(mid,payload,url=None):
+    return discord_request("PATCH",f"{_webhook_base(url or WEBHOOK)}/messages/{mid}",payload)
+
+def publish_to_webhook(url, mid, payload):
+    # Nachricht bearbeiten / anlegen; liefert die (ggf. neue) Message-ID
+    if mid:
+        r = edit_existing(mid, payload, url)
+        if r.status_code == 404:
+            mid = None
+        else:
+            r.raise_for_status()
+    if not mid:
+        mid = str(send_new(payload, url))
+    return mid
+
+def load_message_ids():
+    mids = STORE.get(MIDS_FILE, None)
+    if mids is None:
+        # Migration: die alte Einzel-ID gehört zum ersten Webhook
+        mids = {}
+        if MID_FILE.exists() and WEBHOOKS:
+            mids[parse_webhook(WEBHOOKS[0])[0]] = MID_FILE.read_text().strip()
+    return mids
+
+def publish_all(payload, webhooks=None):
+    """
+    Schickt das Payload parallel an alle Webhooks (gemeinsamer Connection-Pool). Fehler eines
+    Webhooks bremsen die anderen nicht; gespeichert wird je Webhook die eigene Message-ID.
+    Liefert {Webhook-ID: Exception} der fehlgeschlagenen Webhooks.
+    """
+    webhooks = WEBHOOKS if webhooks is None else webhooks
+    if not webhooks:
+        raise SystemExit("DISCORD_WEBHOOK_URL(S) nicht gesetzt")
+    mids = load_message_ids()
+    errors = {}
+    with ThreadPoolExecutor(max_workers=len(webhooks)) as ex:
+        futs = {parse_webhook(u)[0]: ex.submit(publish_to_webhook, u, mids.get(parse_webhook(u)[0]), payload) for u in webhooks}
+        for wid, f in futs.items():
+            try:
+                mids[wid] = f.result()
+            except Exception as e:
+                errors[wid] = e
+    STORE.put(MIDS_FILE, mids)
+    return errors
 
 # =========================
 # MAIN
 # =========================
-if __name__ == "__main__":
-    # Regionen prüfen
-    regions = {r: aggregate_region(REGION_HOSTS[r]) for r in REGIONS}
-    last_lat = read_json(LAT_FILE,{})
-    trends={}
-    for r in REGIONS:
-        prev=last_lat.get(r,{}).get("avg")
-        cur=regions[r]["avg"]
-        if prev is None or cur is None: trends[r]="•"
-        else: trends[r]="▲" if cur>(prev+20) else ("▼" if cur<(prev-20) else "→")
-    write_json(LAT_FILE,regions)
+def make_probe_plan():
+    plan = build_probe_plan(
+        {**{r: REGION_HOSTS[r] for r in REGIONS}, **group_regions()},
+        extra_hosts=[h for cfg in PLATFORM_SIGNALS.values() for h in cfg["hosts"]],
+    )
+    warm_probe_pool(sum(plan["samples"].values()))
+    return plan
+
+def main_hosts(plan):
+    return list(dict.fromkeys(h for r in REGIONS for h in plan["regions"][r]))
+
+def update_sketches(sketches, plan, probes):
+    # Regions-Serien für alle Regionen (inkl. Gruppen), Host-Serien nur für die Hauptregionen (Feed)
+    for h in main_hosts(plan):
+        sketches.add(f"host:{h}", probes.get(h, []))
+    for r, hosts in plan["regions"].items():
+        sketches.add(f"region:{r}", [m for h in hosts for m in probes.get(h, [])])
+
+EMBED_CHAR_BUDGET = 6000   # Discord: Summe aller Embed-Texte einer Nachricht
+
+def group_embeds(regions, sev, budget):
+    """Ein kompaktes Embed je Zielgruppe (max. 9 neben dem Haupt-Embed), Zeilen notfalls gekürzt."""
+    out = []
+    for name, cfg in list(TARGET_GROUPS.items())[:9]:
+        keys = [f"{name}/{r}" for r in cfg.get("regions", {})]
+        lines = []
+        for k in keys:
+            v, r = regions[k], k.split("/", 1)[1]
+            lines.append(f"{state_icon(sev[k])} **{r}** – keine Messung" if v["avg"] is None else
+                         f"{state_icon(sev[k])} **{r}** Ø{v['avg']:.0f} ms • Loss {v['loss_pct']}% • n={v['n']}")
+        title, footer = cfg.get("title", name), f"Letzte Prüfung: {now_utc_str()}"
+        room = min(budget - len(title) - len(footer), 4096)
+        if room < 40: break
+        desc = ""
+        for i, line in enumerate(lines):
+            more = f"\n… +{len(lines) - i} weitere"
+            if len(desc) + len(line) + 1 + len(more) > room:
+                desc += more; break
+            desc += ("\n" if desc else "") + line
+        budget -= len(title) + len(footer) + len(desc)
+        out.append({"title": title, "description": desc or "—",
+                    "color": COLORS.get(worst_state([sev[k] for k in keys]) if keys else "unknown", COLORS["unknown"]),
+                    "footer": {"text": footer}})
+    return out
 
-    maint_state,maint_msg=fetch_maintenance_hint()
-    ki_count,ki_title,ki_url=fetch_known_issues_summary()
-    news_title, news_url = fetch_latest_news()
+def build_status(plan, res, fresh=None, record_history=True):
+    """
+    Baut aus den Stage-Ergebnissen das Discord-Payload (+ semantischen Inhalt für die
+    Änderungserkennung) und pflegt dabei den State (Sketches, Verlauf, Changelog). fresh = Stages, die in diesem Durchlauf wirklich
+    gelaufen sind (None = alle); nur frische Probes landen in den Sketches.
+    """
+    probes = res["latency"]
+    regions = aggregate_regions(plan["regions"], per_host=probes)
+    sketches = LatencySketches.load()
+    lat_fresh = fresh is None or "latency" in fresh
+    if lat_fresh:
+        update_sketches(sketches, plan, probes)
+        sketches.save()
+    pct = {r: latency_percentiles(sketches, f"region:{r}") for r in plan["regions"]}
+    runs = recent_runs(regions, fresh=lat_fresh)
+    if lat_fresh: STORE.put(RUN_P50_DOC, runs)
+    basis = {r: latency_basis(regions[r], runs[r]) for r in plan["regions"]}
+    trends = {r: latency_trend(basis[r], pct[r], regions[r]["n"]) for r in REGIONS}
+    STORE.put(LAT_FILE,regions)
+
+    maint_state,maint_msg=res["maintenance"]
+    ki_count,ki_title,ki_url,*ki_rest=res["known_issues"]   # ältere Cache-Einträge ohne 7T-Zahl
+    ki_7d=ki_rest[0] if ki_rest else None
+    news_title, news_url = res["news"]
 
-    parts=[maint_state]+[severity_from_latency(regions[r]["avg"]) for r in REGIONS]
+    sev = region_severities(regions, runs)
+    parts=[maint_state]+[sev[r] for r in REGIONS]
     if ki_count and ki_count>0: parts.append("info")
     new_state=worst_state(parts)
 
-    hist=append_history(new_state=="ok")
+    hist=append_history(new_state=="ok") if record_history else open_history()
     u24,u7=uptimes(hist)
-    render_sparkline(hist)
+    u30=hist.uptime("30d")
+    u_all=hist.uptimes()
+    with span("sparkline"):
+        spark=render_sparkline(hist, sketches)
+    hist.close()
 
-    old_state=read_json(STATE_FILE,{"state":"ok"})["state"]
+    st=STORE.get(STATE_FILE,{"state":"ok"})
+    old_state=st["state"]
     if old_state!=new_state:
         save_changelog_change(old_state,new_state)
-        write_json(STATE_FILE,{"state":new_state})
+    if old_state!=new_state or st.get("buckets")!=sev:
+        STORE.put(STATE_FILE,{"state":new_state,"buckets":sev})
 
     head_bits=[
         f"{r} Ø{regions[r]['avg']:.0f}ms" if regions[r]["avg"] else f"{r} n/a"
@@ -432,9 +1965,9 @@ if __name__ == "__main__":
     description=f"```\n{head_line}\n```"
 
     # Plattformen (robuste Signals + Quorum + Cache)
-    platforms=robust_platform_status_overview(new_state)
+    platforms=robust_platform_status_overview(new_state, checked=res["platforms"])
     lines=[]
-    for name in ("PC","PlayStation","Xbox","Switch"):
+    for name in ("PC", *(n for n in PLATFORM_SIGNALS if n in platforms)):   # Reihenfolge wie in der Konfig
         st,_,link,age=platforms[name]
         age_txt=f" (cached {age}m)" if age else ""
         lines.append(f"{name:<11} {platform_icon(st)} {st.upper():<7}{age_txt}")
@@ -446,7 +1979,7 @@ if __name__ == "__main__":
         "name":"Gesamtstatus",
         "value":(
             f"{state_icon(new_state)} **{new_state.upper()}**\n"
-            f"Uptime 24h: **{u24}%** • 7T: **{u7}%**"
+            f"Uptime 24h: **{u24}%** • 7T: **{u7}%** • 30T: **{u30}%**"
         ),
         "inline":False,
     })
@@ -456,10 +1989,17 @@ if __name__ == "__main__":
         if v["avg"] is None:
             val="keine Messung"
         else:
+            ci=f" ±{v['ci_ms']:.0f}" if v["ci_ms"] is not None else ""
+            loss=f"{v['loss_pct']}%"+(f" [{v['loss_ci'][0]}–{v['loss_ci'][1]}]" if 0<v["loss_pct"]<100 else "")
             val=(
-                f"Ø {v['avg']} ms ({v['min']}/{v['max']}) {trends[r]}\n"
-                f"Jitter: {v['jitter']} ms • Loss: {v['loss_pct']}%"
+                f"Ø {v['avg']}{ci} ms ({v['min']}/{v['max']}) {trends[r]}\n"
+                f"Jitter: {v['jitter']} ms • Loss: {loss} • n={v['n']}"
             )
+            if "tls_avg" in v or "ttfb_avg" in v:
+                val += f"\nTCP/TLS/TTFB: {v['avg']:.0f}/{v.get('tls_avg', '–')}/{v.get('ttfb_avg', '–')} ms"
+            for w, label in (("24h", "24h"), ("7d", "7T")):
+                if d := pct[r][w]:
+                    val += f"\n{label} p50/p95/p99: {d['p50']:.0f}/{d['p95']:.0f}/{d['p99']:.0f} ms"
         fields.append({"name":f"{r} – Erreichbarkeit","value":val,"inline":True})
     maint_label = (
         "Keine Hinweise" if maint_state == "ok"
@@ -482,6 +2022,8 @@ if __name__ == "__main__":
     else:
         ki_state = "ok"
         ki_label = "Keine neuen Beiträge in 24h"
+    if ki_7d is not None:
+        ki_label += f" • {ki_7d} in 7T"
     ki_lines = [f"{state_icon(ki_state)} **{ki_label}**"]
     if ki_title:
         ki_lines.append(f"Letzter Eintrag: [„{ki_title}“]({ki_url})")
@@ -506,8 +2048,9 @@ if __name__ == "__main__":
     }
     if THUMB_URL:
         embed["thumbnail"]={"url":THUMB_URL}
-    if REPO and SPARK_PATH.exists():
-        embed["image"]={"url":f"https://raw.githubusercontent.com/{REPO}/main/assets/sparkline.png"}
+    if REPO and spark:
+        # ?v= nur bei neuem Bildinhalt -> Discord-Proxy zeigt kein veraltetes Bild
+        embed["image"]={"url":f"https://raw.githubusercontent.com/{REPO}/main/assets/sparkline.png?v={spark}"}
 
     components=[{
         "type":1,
@@ -519,22 +2062,219 @@ if __name__ == "__main__":
         ]
     }]
 
-    payload={"content":STATUS_PAGE_URL,"embeds":[embed],"components":components}
+    used=sum(len(str(embed.get(k) or "")) for k in ("title","description"))+len(embed["footer"]["text"]) \
+        +sum(len(f["name"])+len(f["value"]) for f in embed["fields"])
+    payload={"content":STATUS_PAGE_URL,"embeds":[embed]+group_embeds(regions, sev, EMBED_CHAR_BUDGET-used),"components":components}
 
-    # Diff-only: nur editieren, wenn sich etwas geändert hat
-    last = read_json(LAST_FILE, None)
-    if last == payload:
-        raise SystemExit(0)
-    write_json(LAST_FILE, payload)
+    update_feed({
+        "state":new_state,
+        "regions":{r:{"state":sev[r], **{k:v for k,v in regions[r].items() if k not in ("ci_ms","loss_ci")},
+                      "basis":basis[r], "trend":trends[r], "pct":{w:pct[r][w] for w in _SK_WINDOWS}} for r in REGIONS},
+        "hosts":{h:{w:sketches.quantiles(f"host:{h}", w) for w in ("24h","7d")} for h in main_hosts(plan)},
+        "groups":{g:{k.split("/",1)[1]:sev[k] for k in regions if k.startswith(g+"/")} for g in TARGET_GROUPS},
+        "platforms":{name:platforms[name][0] for name in platforms},
+        "maintenance":{"state":maint_state, "text":maint_msg},
+        "known_issues":{"24h":ki_count, "7d":ki_7d, "latest":ki_title, "url":ki_url},
+        "news":{"title":news_title, "url":news_url},
+        "changelog":STORE.get(CHANGELOG,[]),
+    }, uptime=u_all, up_ok=(new_state=="ok") if record_history else None,
+       lat={r:regions[r]["avg"] for r in REGIONS} if fresh is None or "latency" in fresh else None)
 
-    # Nachricht bearbeiten / anlegen
-    mid = MID_FILE.read_text().strip() if MID_FILE.exists() else None
-    if mid:
-        r = edit_existing(mid, payload)
-        if r.status_code == 404:
-            mid = None
-        else:
-            r.raise_for_status()
-    if not mid:
-        new_id = send_new(payload)
-        MID_FILE.write_text(str(new_id))
+    # Nur was eine Änderung "bedeutet": Zustände, gebucketete Latenzen, Identität von News/Issues.
+    # Footer, timestamp, Cache-Alter und Trendpfeile bleiben außen vor.
+    semantic={
+        "state":new_state,
+        "regions":{r:[sev[r], latency_bucket(regions[r]["avg"]), (regions[r]["loss_pct"] or 0)//LOSS_BUCKET_PCT] for r in regions},
+        "platforms":{name:platforms[name][0] for name in platforms},
+        "maintenance":[maint_state, maint_msg],
+        "known_issues":[ki_count, ki_title, ki_url, ki_7d],
+        "news":[news_title, news_url],
+        "uptime":[u24, u7, u30],
+        "changelog":last_changelog_lines(2),
+    }
+    return payload, semantic
+
+def semantic_digest(semantic):
+    return hashlib.sha256(json.dumps(semantic, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+def publish(payload, semantic=None):
+    """
+    Diff-only auf Basis des semantischen Inhalts: gleicher Digest -> kein Discord-Call und
+    kein State-Write, außer die letzte Veröffentlichung ist älter als MIN_REFRESH_S
+    (dann werden die volatilen Felder wie "Letzte Prüfung" aufgefrischt).
+    """
+    digest = semantic_digest(semantic) if semantic is not None else semantic_digest(payload)
+    last = STORE.get(DIGEST_FILE, {})
+    if last.get("digest") == digest and time.time() - last.get("ts", 0) < MIN_REFRESH_S:
+        return False
+    with span("discord", webhooks=len(WEBHOOKS)):
+        errors = publish_all(payload)
+    if errors:
+        # Digest nicht merken -> nächster Lauf versucht es erneut (PATCH ist idempotent)
+        msg = _redact("Webhook(s) fehlgeschlagen: " + ", ".join(f"{w}: {e!r}" for w, e in errors.items()))
+        if len(errors) == len(WEBHOOKS):
+            # keiner erreicht (z. B. Token widerrufen): Lauf abbrechen, damit der Job rot wird
+            raise RuntimeError(msg)
+        print(msg, flush=True)
+        return False
+    STORE.put(LAST_FILE, payload)
+    STORE.put(DIGEST_FILE, {"digest": digest, "ts": int(time.time())})
+    return True
+
+# =========================
+# Fast-Path: nichts geändert -> kein Parsen, kein PIL, kein Discord
+# =========================
+FAST_PATH = os.environ.get("FAST_PATH", "false").lower() in ("1", "true", "yes")
+FAST_SOURCE_TTL_S   = float(os.environ.get("FAST_SOURCE_TTL_S", "10800"))
+FAST_PLATFORM_TTL_S = float(os.environ.get("FAST_PLATFORM_TTL_S", "5400"))
+
+def fast_path_unchanged(plan, probes):
+    """
+    True, wenn alle gecachten Quellen (letzte gute Werte, Plattform-Cache) noch frisch sind
+    und die Regionen in denselben Severity-Buckets liegen wie beim letzten vollen Lauf.
+    Dann werden nur Sketches und Verlauf fortgeschrieben – ohne requests/bs4/PIL.
+    """
+    now = time.time()
+    last_good = STORE.get(SOURCES_FILE, {})
+    if any(now - last_good.get(n, {}).get("ts", 0) > FAST_SOURCE_TTL_S for n in ("maintenance", "known_issues", "news")):
+        return False
+    pcache = STORE.get(PLATFORM_CACHE, {})
+    if any(now - pcache.get(n, {}).get("ts", 0) > FAST_PLATFORM_TTL_S for n in PLATFORM_SIGNALS):
+        return False
+    st = STORE.get(STATE_FILE, {})
+    regions = aggregate_regions(plan["regions"], per_host=probes)
+    sketches = LatencySketches.load()
+    update_sketches(sketches, plan, probes)
+    runs = recent_runs(regions)
+    if "state" not in st or st.get("buckets") != region_severities(regions, runs):
+        return False
+    sketches.save()
+    STORE.put(RUN_P50_DOC, runs)
+    STORE.put(LAT_FILE, regions)
+    hist = append_history(st["state"] == "ok")
+    update_feed(uptime=hist.uptimes(), up_ok=st["state"] == "ok", lat={r: regions[r]["avg"] for r in REGIONS})
+    hist.close()
+    return True
+
+def _run_once(fast):
+    # Probes + alle Quellen parallel; das Embed wird erst danach gebaut
+    plan = make_probe_plan()
+    if not fast:
+        res, origin = run_stages(source_stages(plan))
+    else:
+        probes = execute_probe_plan(plan)
+        if fast_path_unchanged(plan, probes):
+            return "fast", {}
+        stages = {n: st for n, st in source_stages(plan).items() if n != "latency"}
+        res, origin = run_stages(stages, inputs={"latency": probes})
+        res["latency"] = probes
+    with span("build"):
+        status = build_status(plan, res)
+    return ("published" if publish(*status) else "unchanged"), origin
+
+def run_once(fast=FAST_PATH):
+    # State einmal laden, am Ende ein Commit – bricht der Lauf ab, bleibt der alte Stand
+    SPANS.reset()
+    mode, origin = "failed", {}
+    try:
+        STORE.load()
+        mode, origin = _run_once(fast)
+        with span("commit"):
+            STORE.commit()
+    finally:
+        write_metrics(mode=mode, origin=origin)
+
+def importtime_report(top=15):
+    """
+    Startkosten wie `python -X importtime`: Modul-Import (kalt) plus die lazy geladenen
+    Abhängigkeiten. Jeder Bericht wird an .bot_state/startup.jsonl angehängt.
+    """
+    import subprocess, sys
+    env = dict(os.environ)
+    here = str(Path(__file__).resolve().parent)
+    def measure(code):
+        err = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, cwd=os.getcwd(),
+                             capture_output=True, text=True).stderr
+        mods = {}
+        for line in err.splitlines():
+            if not line.startswith("import time:") or "[us]" in line: continue
+            _, cum, name = line[len("import time:"):].split("|")
+            if not name[1:].startswith(" "):   # nur Top-Level-Imports (nicht eingerückt)
+                mods[name.strip()] = int(cum)
+        return mods
+    report = {"t": int(time.time()), "python": sys.version.split()[0]}
+    for label, code in (("startup", f"import sys; sys.path.insert(0, {here!r}); import ow_status"),
+                        ("lazy", "import requests, bs4, PIL.Image")):
+        mods = measure(code)
+        report[label] = {"total_ms": round(sum(mods.values())/1000, 1),
+                         "top": {k: round(v/1000, 1) for k, v in sorted(mods.items(), key=lambda kv: -kv[1])[:top]}}
+        print(f"{label}: {report[label]['total_ms']} ms")
+        for k, v in report[label]["top"].items():
+            print(f"  {v:>8.1f} ms  {k}")
+    with open(STATE_DIR / "startup.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, separators=(",",":")) + "\n")
+    return report
+
+# =========================
+# Daemon-Modus (eigene Intervalle je Quelle)
+# =========================
+DAEMON_INTERVALS = {
+    "latency":      float(os.environ.get("DAEMON_LATENCY_S", "60")),
+    "platforms":    float(os.environ.get("DAEMON_PLATFORMS_S", "300")),
+    "maintenance":  float(os.environ.get("DAEMON_MAINT_S", "1800")),
+    "known_issues": float(os.environ.get("DAEMON_ISSUES_S", "1800")),
+    "news":         float(os.environ.get("DAEMON_NEWS_S", "1800")),
+}
+HISTORY_INTERVAL = float(os.environ.get("HISTORY_INTERVAL", "3600"))   # Uptime-Sample höchstens so oft
+
+def run_daemon():
+    """
+    Bleibt resident: Session, DNS- und HTTP-Cache bleiben warm, jede Quelle läuft in ihrem
+    eigenen Intervall. Veröffentlicht wird nur bei semantischer Änderung (siehe publish).
+    """
+    STORE.load()
+    plan = make_probe_plan()
+    stages = source_stages(plan)
+    due = {name: 0.0 for name in stages}
+    res, last_hist = {}, 0.0
+    while True:
+        now = time.monotonic()
+        batch = {n: st for n, st in stages.items() if due[n] <= now}
+        if batch:
+            SPANS.reset()
+            origin, mode = {}, "failed"
+            try:
+                out, origin = run_stages(batch, inputs=res)
+                res.update(out)
+                record = time.time() - last_hist >= HISTORY_INTERVAL
+                with span("build"):
+                    status = build_status(plan, res, fresh=set(out), record_history=record)
+                mode = "unchanged"
+                if publish(*status):
+                    mode = "published"
+                    print(f"[{now_utc_str()}] veröffentlicht ({', '.join(batch)})", flush=True)
+                if record:
+                    last_hist = time.time()
+                with span("commit"):
+                    STORE.commit()
+            except Exception as e:
+                STORE.rollback()   # sonst schreibt der nächste Commit die halben Änderungen (z. B. History) nach
+                print(_redact(f"[{now_utc_str()}] Durchlauf fehlgeschlagen: {e!r}"), flush=True)
+            write_metrics(mode=mode, origin=origin)
+            for n in batch:
+                due[n] = now + DAEMON_INTERVALS.get(n, 300)
+        time.sleep(max(min(due.values()) - time.monotonic(), 1.0))
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Overwatch 2 Status -> Discord")
+    ap.add_argument("--daemon", action="store_true", help="resident laufen, Quellen nach eigenem Intervall prüfen")
+    ap.add_argument("--fast", action="store_true", help="Fast-Path: bei unverändertem Stand nichts parsen/rendern/senden")
+    ap.add_argument("--importtime", action="store_true", help="Import-/Startkosten messen und protokollieren")
+    args = ap.parse_args()
+    try:
+        if args.importtime: importtime_report()
+        elif args.daemon:   run_daemon()
+        else:               run_once(fast=args.fast or FAST_PATH)
+    except KeyboardInterrupt:
+        pass